@@ -1,8 +1,8 @@
 import json
 import random
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from enum import StrEnum, auto
-from typing import TypeAlias
+from typing import Any, TypeAlias
 
 import libsbml
 
@@ -38,6 +38,16 @@ class OtherParameterCategory(StrEnum):
     TIME = auto()
 
 
+def model_annotation(sbml_document: libsbml.SBMLDocument) -> dict[str, Any]:
+    return json.loads(
+        sbml_document.getModel()
+        .getAnnotationString()
+        .replace("<annotation>", "")
+        .replace("</annotation>", "")
+        .replace("&quot;", '"')
+    )
+
+
 @dataclass(init=True, repr=False, eq=False, order=False, frozen=True)
 class BiologicalModel:
     sbml_document: libsbml.SBMLDocument
@@ -45,6 +55,9 @@ class BiologicalModel:
     kinetic_constants: dict[SId, ConstantCategory]
     kinetic_constants_order: PartialOrder[SId]
     other_parameters: dict[SId, OtherParameterCategory]
+    mean_rate_rules: bool = field(default=True)
+    # Integrator settings the model is simulated with, see `calibrate.py`.
+    integrator: dict[str, Any] = field(default_factory=dict)
 
     @staticmethod
     def load(sbml_document: libsbml.SBMLDocument) -> "BiologicalModel":
@@ -74,13 +87,7 @@ class BiologicalModel:
             else:
                 other_parameters[parameter.getId()] = parameter_category
 
-        model_annotation: dict[str, list[list[str]]] = json.loads(
-            sbml_document.getModel()
-            .getAnnotationString()
-            .replace("<annotation>", "")
-            .replace("</annotation>", "")
-            .replace("&quot;", '"')
-        )
+        annotation: dict[str, Any] = model_annotation(sbml_document)
 
         return BiologicalModel(
             sbml_document=sbml_document,
@@ -89,17 +96,20 @@ class BiologicalModel:
                     PhysicalEntity(id=ReactomeDbId(int(species_1))),
                     PhysicalEntity(id=ReactomeDbId(int(species_2))),
                 )
-                for (species_1, species_2) in model_annotation["species_order"]
+                for (species_1, species_2) in annotation["species_order"]
             },
             kinetic_constants=kinetic_constants,
             kinetic_constants_order={
                 (kinetic_constant_1, kinetic_constant_2)
-                for (
-                    kinetic_constant_1,
-                    kinetic_constant_2,
-                ) in model_annotation["kinetic_constants_order"]
+                for (kinetic_constant_1, kinetic_constant_2) in annotation[
+                    "kinetic_constants_order"
+                ]
             },
             other_parameters=other_parameters,
+            # Models generated before the annotation existed always carry the
+            # `mean_` rate rules.
+            mean_rate_rules=annotation.get("mean_rate_rules", True),
+            integrator=annotation.get("integrator", {}),
         )
 
     def __call__(self) -> VirtualPatient:
@@ -122,6 +122,9 @@ class BiologicalScenarioDefinition:
     kinetic_laws: dict[ReactionLikeEvent, KineticLaw] = field(
         default_factory=dict
     )
+    # When False the running means of the species are not part of the ODE
+    # system, they are computed from the simulated trajectory instead.
+    mean_rate_rules: bool = field(default=True)
 
     def __post_init__(self) -> None:
         assert self.physical_entities  # 1..*
@@ -500,9 +503,10 @@ class BiologicalScenarioDefinition:
         time.setValue(0.0)
         time.setAnnotation(str(OtherParameterCategory.TIME))
 
-        time_rate_rule: libsbml.RateRule = sbml_model.createRateRule()
-        time_rate_rule.setVariable("time_")
-        time_rate_rule.setFormula("1")
+        if self.mean_rate_rules:
+            time_rate_rule: libsbml.RateRule = sbml_model.createRateRule()
+            time_rate_rule.setVariable("time_")
+            time_rate_rule.setFormula("1")
 
         kinetic_constants: dict[SId, ConstantCategory] = {}
         other_parameters: dict[SId, OtherParameterCategory] = {
@@ -581,13 +585,14 @@ class BiologicalScenarioDefinition:
             sbml_species_mean.setConstant(False)
             sbml_species_mean.setValue(0.0)
 
-            sbml_species_mean_rule: libsbml.RateRule = (
-                sbml_model.createRateRule()
-            )
-            sbml_species_mean_rule.setVariable(sbml_species_mean.getId())
-            sbml_species_mean_rule.setFormula(
-                f"({sbml_species.getId()} - {sbml_species_mean.getId()}) / ({time.getId()} + 10e-6)"
-            )
+            if self.mean_rate_rules:
+                sbml_species_mean_rule: libsbml.RateRule = (
+                    sbml_model.createRateRule()
+                )
+                sbml_species_mean_rule.setVariable(sbml_species_mean.getId())
+                sbml_species_mean_rule.setFormula(
+                    f"({sbml_species.getId()} - {sbml_species_mean.getId()}) / ({time.getId()} + 10e-6)"
+                )
 
             if (
                 obj.id in reachable_biochemical_network.interface__inputs
@@ -708,6 +713,7 @@ class BiologicalScenarioDefinition:
                     "species_order": [
                         list(map(int, order)) for order in self.constraints
                     ],
+                    "mean_rate_rules": self.mean_rate_rules,
                 }
             )
         )
@@ -718,4 +724,5 @@ class BiologicalScenarioDefinition:
             other_parameters=other_parameters,
             kinetic_constants=kinetic_constants,
             kinetic_constants_order=kinetic_constants_order,
+            mean_rate_rules=self.mean_rate_rules,
         )
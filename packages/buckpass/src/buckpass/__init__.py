@@ -5,17 +5,25 @@ from buckpass.core import openbox_api
 from .core import IntGEZ
 from .core.policy import Policy
 from .core.submitter import Submitter
+from .event_source.slurm import SlurmEventSource
+from .policy.adaptive import AdaptivePolicy
 from .policy.batch import BatchPolicy
+from .policy.straggler import StragglerPolicy
 from .submitter.emulation import EmulationSubmitter
+from .submitter.local import LocalSubmitter
 from .submitter.uniroma1 import Uniroma1Submitter
 
 __version__ = version = "0.1.0"
 
 __all__ = [
+    "AdaptivePolicy",
     "BatchPolicy",
     "EmulationSubmitter",
     "IntGEZ",
+    "LocalSubmitter",
     "Policy",
+    "SlurmEventSource",
+    "StragglerPolicy",
     "Submitter",
     "Uniroma1Submitter",
     "__version__",
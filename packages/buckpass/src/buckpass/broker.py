@@ -0,0 +1,338 @@
+"""Broker between the workers and an OpenBox server.
+
+It exposes the endpoints `openbox_api.URL` targets: suggestions are served
+from a buffer per task, refilled in the background, observations are
+acknowledged at once and sent to OpenBox one at a time by a single thread,
+so that the load on OpenBox does not grow with the number of workers.
+Observations are retried while OpenBox cannot be reached (or fails with a
+5xx), the ones it rejects, might have recorded, or cannot be sent before
+the broker closes are appended to a file instead. The endpoint
+`suggestion_rate/` returns how many suggestions per second OpenBox serves
+for a task, measured on the suggestions fetched. Any other endpoint is
+forwarded as is.
+"""
+
+import argparse
+import json
+import logging
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any
+from urllib.parse import parse_qs
+
+import requests
+from typing_extensions import override
+
+from buckpass.core.openbox_api import (
+    URL,
+    NoSuggestionError,
+    OpenBoxClient,
+    TaskId,
+)
+
+logger: logging.Logger = logging.getLogger(__name__)
+
+
+class Broker:
+    __url: URL
+    __client: OpenBoxClient
+    __uploader_client: OpenBoxClient
+    __buffer_size: int
+    __lock: threading.Lock
+    __refilled: threading.Condition
+    __suggestions: dict[TaskId, deque[Any]]
+    __refilling: set[TaskId]
+    __finished: set[TaskId]
+    __prefetcher: ThreadPoolExecutor
+    __observations: queue.Queue[dict[str, Any] | None]
+    __observation_keys: set[str]
+    __uploader: threading.Thread
+    __failed_path: Path
+    __max_backoff: float
+    __closing: threading.Event
+    __latencies: dict[TaskId, float]
+    __alpha: float
+
+    def __init__(
+        self,
+        url: URL,
+        buffer_size: int = 8,
+        failed_path: Path = Path("failed_observations.jsonl"),
+        max_backoff: float = 60,
+        alpha: float = 0.2,
+    ) -> None:
+        self.__url = url
+        self.__client = OpenBoxClient(url)
+        # The uploader retries by itself, for as long as the broker runs.
+        self.__uploader_client = OpenBoxClient(url, retries=0)
+        self.__buffer_size = buffer_size
+        self.__lock = threading.Lock()
+        self.__refilled = threading.Condition(self.__lock)
+        self.__suggestions = {}
+        self.__refilling = set()
+        self.__finished = set()
+        self.__prefetcher = ThreadPoolExecutor(max_workers=4)
+        self.__observations = queue.Queue()
+        self.__observation_keys = set()
+        self.__failed_path = failed_path
+        self.__max_backoff = max_backoff
+        self.__closing = threading.Event()
+        self.__latencies = {}
+        self.__alpha = alpha
+        self.__uploader = threading.Thread(target=self.__upload, daemon=True)
+        self.__uploader.start()
+
+    def get_suggestion(self, task_id: TaskId) -> Any | None:
+        """Return a suggestion for `task_id`, None once there are none left."""
+        with self.__lock:
+            suggestions = self.__suggestions.setdefault(task_id, deque())
+            suggestion = suggestions.popleft() if suggestions else None
+            finished: bool = task_id in self.__finished
+
+        if suggestion is None and not finished:
+            suggestion = self.__fetch(task_id)
+        if suggestion is None:
+            # A refill might be fetching the last suggestions.
+            with self.__refilled:
+                _ = self.__refilled.wait_for(
+                    lambda: task_id not in self.__refilling
+                )
+                suggestion = suggestions.popleft() if suggestions else None
+
+        self.__refill(task_id)
+        return suggestion
+
+    def suggestion_rate(self, task_id: TaskId) -> float | None:
+        """Return the suggestions per second OpenBox serves for `task_id`.
+
+        It is the inverse of the exponentially weighted moving average of the
+        time OpenBox takes to answer, None before the first suggestion.
+        """
+        with self.__lock:
+            latency: float | None = self.__latencies.get(task_id)
+        return None if latency is None else 1 / max(latency, 1e-6)
+
+    def update_observation(self, data: dict[str, Any]) -> None:
+        # Only a key sent by the worker identifies a retry of the same
+        # observation: two workers may evaluate the same config.
+        key: str | None = data.get("idempotency_key") or None
+        if key is not None:
+            with self.__lock:
+                if key in self.__observation_keys:
+                    return
+                self.__observation_keys.add(key)
+
+        self.__observations.put(data)
+
+    def forward(self, endpoint: str, body: bytes, content_type: str) -> bytes:
+        return requests.post(
+            f"{self.__url}{endpoint}",
+            data=body,
+            headers={"Content-Type": content_type},
+            timeout=(10, 10000),
+        ).content
+
+    def close(self) -> None:
+        """Send the observations still in the queue, once each."""
+        self.__closing.set()
+        self.__observations.put(None)
+        self.__uploader.join()
+        self.__prefetcher.shutdown(wait=False, cancel_futures=True)
+
+    def __fetch(self, task_id: TaskId) -> Any | None:
+        start: float = time.monotonic()
+        try:
+            suggestion = self.__client.get_suggestion(task_id)
+        except NoSuggestionError:
+            with self.__lock:
+                self.__finished.add(task_id)
+            return None
+
+        latency: float = time.monotonic() - start
+        with self.__lock:
+            average: float | None = self.__latencies.get(task_id)
+            self.__latencies[task_id] = (
+                latency
+                if average is None
+                else self.__alpha * latency + (1 - self.__alpha) * average
+            )
+        return suggestion
+
+    def __refill(self, task_id: TaskId) -> None:
+        with self.__lock:
+            if task_id in self.__refilling or task_id in self.__finished:
+                return
+            self.__refilling.add(task_id)
+
+        def _refill() -> None:
+            try:
+                while True:
+                    with self.__lock:
+                        if (
+                            len(self.__suggestions[task_id])
+                            >= self.__buffer_size
+                            or task_id in self.__finished
+                        ):
+                            return
+
+                    suggestion = self.__fetch(task_id)
+                    if suggestion is None:
+                        return
+
+                    with self.__lock:
+                        self.__suggestions[task_id].append(suggestion)
+            except Exception:
+                logger.exception("prefetching suggestions of %s", task_id)
+            finally:
+                with self.__lock:
+                    self.__refilling.discard(task_id)
+                    self.__refilled.notify_all()
+
+        _ = self.__prefetcher.submit(_refill)
+
+    def __upload(self) -> None:
+        while (data := self.__observations.get()) is not None:
+            attempt: int = 0
+            while True:
+                try:
+                    self.__uploader_client.update_observation(
+                        data["task_id"],
+                        json.loads(data["config"]),
+                        json.loads(data["objectives"]),
+                        constraints=json.loads(data.get("constraints", "[]")),
+                        trial_info=json.loads(data.get("trial_info", "{}")),
+                        trial_state=int(data.get("trial_state", 0)),
+                        idempotency_key=data.get("idempotency_key") or None,
+                    )
+                    break
+                except Exception as exception:
+                    logger.exception("sending observation %s", data)
+                    if self.__closing.is_set() or not _transient(exception):
+                        self.__persist(data)
+                        break
+
+                _ = self.__closing.wait(min(self.__max_backoff, 2**attempt))
+                attempt += 1
+
+    def __persist(self, data: dict[str, Any]) -> None:
+        with self.__failed_path.open("a") as file:
+            _ = file.write(f"{json.dumps(data)}\n")
+
+    def serve(self, host: str, port: int) -> None:
+        broker: Broker = self
+
+        class _Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self) -> None:
+                body: bytes = self.rfile.read(
+                    int(self.headers.get("Content-Length", 0))
+                )
+                endpoint: str = self.path.removeprefix("/bo_advice/")
+                response: bytes
+                match endpoint:
+                    case "get_suggestion/":
+                        data = _form(body)
+                        suggestion = broker.get_suggestion(data["task_id"])
+                        response = json.dumps(
+                            {"code": 0, "msg": "no suggestion left"}
+                            if suggestion is None
+                            else {"code": 1, "res": json.dumps(suggestion)}
+                        ).encode()
+                    case "suggestion_rate/":
+                        response = json.dumps(
+                            {
+                                "code": 1,
+                                "rate": broker.suggestion_rate(
+                                    _form(body)["task_id"]
+                                ),
+                            }
+                        ).encode()
+                    case "update_observation/":
+                        broker.update_observation(_form(body))
+                        response = json.dumps({"code": 1}).encode()
+                    case _:
+                        response = broker.forward(
+                            endpoint, body, self.headers.get("Content-Type", "")
+                        )
+
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(response)))
+                self.end_headers()
+                _ = self.wfile.write(response)
+
+            @override
+            def log_message(self, format: str, *args: Any) -> None:
+                logger.debug(format, *args)
+
+        server = ThreadingHTTPServer((host, port), _Handler)
+        try:
+            server.serve_forever()
+        finally:
+            server.server_close()
+            self.close()
+
+
+def suggestion_rate(url: URL, task_id: TaskId) -> float | None:
+    """Ask the broker at `url` for `Broker.suggestion_rate`, None on errors."""
+    try:
+        response: requests.Response = requests.post(
+            f"{url}suggestion_rate/", data={"task_id": task_id}, timeout=10
+        )
+        response.raise_for_status()
+        return response.json()["rate"]
+    except (requests.RequestException, ValueError, KeyError):
+        logger.warning("no suggestion rate from %s", url, exc_info=True)
+        return None
+
+
+def _transient(exception: Exception) -> bool:
+    """Return whether sending the observation again might succeed.
+
+    Not after a read timeout: OpenBox might have recorded the observation,
+    sending it again could duplicate it.
+    """
+    if isinstance(exception, requests.ReadTimeout):
+        return False
+    if isinstance(exception, requests.HTTPError):
+        return exception.response.status_code >= 500  # noqa: PLR2004
+    return isinstance(exception, (requests.ConnectionError, requests.Timeout))
+
+
+def _form(body: bytes) -> dict[str, Any]:
+    return {
+        key: values[0]
+        for key, values in parse_qs(
+            body.decode(), keep_blank_values=True
+        ).items()
+    }
+
+
+def main() -> None:
+    argument_parser: argparse.ArgumentParser = argparse.ArgumentParser()
+    _ = argument_parser.add_argument("--openbox-host", default="localhost")
+    _ = argument_parser.add_argument("--openbox-port", type=int, default=8000)
+    _ = argument_parser.add_argument("--host", default="0.0.0.0")  # noqa: S104
+    _ = argument_parser.add_argument("--port", type=int, default=8001)
+    _ = argument_parser.add_argument("--buffer-size", type=int, default=8)
+    _ = argument_parser.add_argument(
+        "--failed-path", type=Path, default=Path("failed_observations.jsonl")
+    )
+    args: argparse.Namespace = argument_parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    Broker(
+        URL(host=args.openbox_host, port=args.openbox_port),
+        buffer_size=args.buffer_size,
+        failed_path=args.failed_path,
+    ).serve(args.host, args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,19 +1,36 @@
+import asyncio
 import hashlib
 import json
+import random
 import re
+import time
+from collections import OrderedDict
 from typing import Any
 
 import requests
-from openbox.utils.config_space import Configuration
-from openbox.utils.config_space import json as config_json
+from requests.adapters import HTTPAdapter
 from typing_extensions import override
 
 TaskId = str
 
+# Trial states, as in `openbox.utils.constants`, which is not imported so
+# that workers do not pay for importing OpenBox.
+SUCCESS = 0
+FAILED = 1
+TIMEOUT = 2
+
 
 TCP_MAX_PORT = 65535
 
 
+class NoSuggestionError(Exception):
+    """OpenBox has no suggestion left for the task, e.g. after `max_runs`."""
+
+
+class ObservationRejectedError(Exception):
+    """OpenBox did not record an observation, sending it again will not help."""
+
+
 class URL:
     __url: str
 
@@ -57,6 +74,9 @@ def register_task(
     parallel_type: str = "async",
     ref_point: list[float] = [],
 ) -> str:
+    from openbox.utils.config_space import Configuration  # noqa: PLC0415
+    from openbox.utils.config_space import json as config_json  # noqa: PLC0415
+
     # email = email
     md5 = hashlib.md5()
     md5.update(password.encode("utf-8"))
@@ -124,14 +144,197 @@ def register_task(
         raise Exception("Server error %s" % res["msg"])
 
 
-def get_suggestion(url: URL, task_id: TaskId):
-    result = requests.post(
-        f"{url}get_suggestion/", data={"task_id": task_id}, timeout=10000
-    )
-    response: dict[str, Any] = json.loads(result.text)
+class OpenBoxClient:
+    """Client of an OpenBox server that reuses its connections.
+
+    Requests failing because of the network or of the server (5xx) are
+    retried up to `retries` times, waiting a random time up to
+    `backoff * 2**attempt` seconds (at most `max_backoff`) in between.
+    Observations are not retried after a read timeout, as the server might
+    have recorded them. An observation sent with an `idempotency_key` is
+    sent once by the same client, even if the caller retries it.
+    """
+
+    __url: URL
+    __session: requests.Session
+    __timeout: tuple[float, float]
+    __retries: int
+    __backoff: float
+    __max_backoff: float
+    __observations: OrderedDict[str, None]
+    __idempotency_keys: int
+
+    def __init__(
+        self,
+        url: URL,
+        connect_timeout: float = 10,
+        read_timeout: float = 10000,
+        retries: int = 5,
+        backoff: float = 0.5,
+        max_backoff: float = 30,
+        pool_size: int = 4,
+        idempotency_keys: int = 1024,
+    ) -> None:
+        self.__url = url
+        self.__session = requests.Session()
+        self.__session.mount(
+            "http://", HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        )
+        self.__timeout = (connect_timeout, read_timeout)
+        self.__retries = retries
+        self.__backoff = backoff
+        self.__max_backoff = max_backoff
+        self.__observations = OrderedDict()
+        self.__idempotency_keys = idempotency_keys
+
+    def __post(
+        self,
+        endpoint: str,
+        data: dict[str, Any],
+        headers: dict[str, str] | None = None,
+        *,
+        idempotent: bool = True,
+    ) -> dict[str, Any]:
+        for attempt in range(self.__retries + 1):
+            try:
+                result = self.__session.post(
+                    f"{self.__url}{endpoint}/",
+                    data=data,
+                    headers=headers,
+                    timeout=self.__timeout,
+                )
+                result.raise_for_status()
+                return json.loads(result.text)
+            except requests.ReadTimeout:
+                if attempt == self.__retries or not idempotent:
+                    raise
+            except (requests.ConnectionError, requests.Timeout):
+                if attempt == self.__retries:
+                    raise
+            except requests.HTTPError as exception:
+                if (
+                    attempt == self.__retries
+                    or exception.response.status_code < 500
+                ):
+                    raise
+
+            time.sleep(
+                random.uniform(
+                    0, min(self.__max_backoff, self.__backoff * 2**attempt)
+                )
+            )
+
+        raise AssertionError
+
+    def get_suggestion(self, task_id: TaskId):
+        response: dict[str, Any] = self.__post(
+            "get_suggestion", data={"task_id": task_id}
+        )
+
+        if not response["code"]:
+            raise NoSuggestionError(response.get("msg", ""))
+        return json.loads(response["res"])
+
+    def update_observation(
+        self,
+        task_id: TaskId,
+        config_dict,
+        objectives,
+        constraints=[],
+        trial_info={},
+        trial_state=0,
+        idempotency_key: str | None = None,
+    ) -> None:
+        data: dict[str, Any] = {
+            "task_id": task_id,
+            "config": json.dumps(config_dict),
+            "objectives": json.dumps(objectives),
+            "constraints": json.dumps(constraints),
+            "trial_state": trial_state,
+            "trial_info": json.dumps(trial_info),
+        }
+        headers: dict[str, str] = {}
+        if idempotency_key is not None:
+            if idempotency_key in self.__observations:
+                return
+            data["idempotency_key"] = idempotency_key
+            headers["Idempotency-Key"] = idempotency_key
+
+        response: dict[str, Any] = self.__post(
+            "update_observation", data=data, headers=headers, idempotent=False
+        )
+
+        if not response["code"]:
+            raise ObservationRejectedError(response.get("msg", ""))
+        if idempotency_key is not None:
+            self.__observations[idempotency_key] = None
+            if len(self.__observations) > self.__idempotency_keys:
+                _ = self.__observations.popitem(last=False)
 
-    assert response["code"]
-    return json.loads(response["res"])
+
+class AsyncOpenBoxClient:
+    """Asyncio interface to an OpenBox server.
+
+    Requests are made by an `OpenBoxClient` on worker threads, at most
+    `concurrency` at a time, so that an event loop can keep many trials in
+    flight while their simulations run elsewhere (e.g. on a process pool).
+    """
+
+    __client: OpenBoxClient
+    __semaphore: asyncio.Semaphore
+
+    def __init__(self, url: URL, concurrency: int = 8, **kwargs: Any) -> None:
+        self.__client = OpenBoxClient(url, pool_size=concurrency, **kwargs)
+        self.__semaphore = asyncio.Semaphore(concurrency)
+
+    async def register_task(self, config_space, **kwargs: Any) -> str:
+        async with self.__semaphore:
+            return await asyncio.to_thread(
+                register_task, config_space, **kwargs
+            )
+
+    async def get_suggestion(self, task_id: TaskId):
+        async with self.__semaphore:
+            return await asyncio.to_thread(
+                self.__client.get_suggestion, task_id
+            )
+
+    async def update_observation(
+        self,
+        task_id: TaskId,
+        config_dict,
+        objectives,
+        constraints=[],
+        trial_info={},
+        trial_state=0,
+        idempotency_key: str | None = None,
+    ) -> None:
+        async with self.__semaphore:
+            await asyncio.to_thread(
+                self.__client.update_observation,
+                task_id,
+                config_dict,
+                objectives,
+                constraints=constraints,
+                trial_info=trial_info,
+                trial_state=trial_state,
+                idempotency_key=idempotency_key,
+            )
+
+
+_clients: dict[str, OpenBoxClient] = {}
+
+
+def client(url: URL) -> OpenBoxClient:
+    """Return the client shared by every request to `url`."""
+    if str(url) not in _clients:
+        _clients[str(url)] = OpenBoxClient(url)
+
+    return _clients[str(url)]
+
+
+def get_suggestion(url: URL, task_id: TaskId):
+    return client(url).get_suggestion(task_id)
 
 
 def update_observation(
@@ -142,20 +345,14 @@ def update_observation(
     constraints=[],
     trial_info={},
     trial_state=0,
+    idempotency_key: str | None = None,
 ) -> None:
-    result = requests.post(
-        f"{url}update_observation/",
-        data={
-            "task_id": task_id,
-            "config": json.dumps(config_dict),
-            "objectives": json.dumps(objectives),
-            "constraints": json.dumps(constraints),
-            "trial_state": trial_state,
-            "trial_info": json.dumps(trial_info),
-        },
-        timeout=10000,
+    client(url).update_observation(
+        task_id,
+        config_dict,
+        objectives,
+        constraints=constraints,
+        trial_info=trial_info,
+        trial_state=trial_state,
+        idempotency_key=idempotency_key,
     )
-
-    response = json.loads(result.text)
-
-    assert response["code"]
@@ -8,3 +8,6 @@ class Policy(ABC, Generic[Event]):
     @abstractmethod
     def update(self, event: Event) -> None:
         pass
+
+    def tick(self) -> None:
+        """React to elapsed time, called on every poll of the event source."""
@@ -0,0 +1,48 @@
+import shlex
+import subprocess
+
+# Every ssh connection to the same host goes through a master connection,
+# kept open for CONTROL_PERSIST seconds after the last one ends: later
+# connections skip the handshake. The master is started on its own, detached
+# and with its stdio on /dev/null: started by a connection whose output is
+# captured, it would keep the pipes open (on OpenSSH versions without the
+# stdfd_devnull fix), and the capture would never end. If the master
+# connection is lost, connections are made directly until the next
+# `open_master`.
+CONTROL_PERSIST: int = 600
+CONTROL_PATH: str = "~/.ssh/buckpass-%C"
+
+
+def control_options() -> list[str]:
+    """Options of a connection through the master connection, if open."""
+    return ["-o", "ControlMaster=no", "-o", f"ControlPath={CONTROL_PATH}"]
+
+
+def open_master_command(
+    ssh: list[str], destination: str, persist: int = CONTROL_PERSIST
+) -> str:
+    """Return a shell command opening the master connection to `destination`.
+
+    It does nothing if the master connection is already open. `ssh` is the
+    ssh command line, without the destination.
+    """
+    options: list[str] = ["-o", f"ControlPath={CONTROL_PATH}"]
+    check: str = shlex.join([*ssh, *options, "-O", "check", destination])
+    start: str = shlex.join(
+        [*ssh, *options, "-o", f"ControlPersist={persist}", "-MNf", destination]
+    )
+    return f"{check} >/dev/null 2>&1 || {start} </dev/null >/dev/null 2>&1"
+
+
+def open_master(
+    ssh: list[str], destination: str, persist: int = CONTROL_PERSIST
+) -> None:
+    """Open the master connection to `destination` from this machine."""
+    _ = subprocess.run(  # noqa: S602
+        open_master_command(ssh, destination, persist),
+        shell=True,
+        check=False,
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
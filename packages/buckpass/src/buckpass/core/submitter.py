@@ -1,11 +1,74 @@
+import logging
 from abc import ABC, abstractmethod
 from typing import Generic, TypeVar
 
+from typing_extensions import override
+
+from buckpass.core import OpenBoxTaskId, SlurmJobId
+
 Args = TypeVar("Args")
 Id = TypeVar("Id")
 
+# Default MaxArraySize of SLURM (1001) minus one, larger arrays are split.
+MAX_ARRAY_SIZE: int = 1000
+
+logger: logging.Logger = logging.getLogger(__name__)
+
 
 class Submitter(ABC, Generic[Args, Id]):
     @abstractmethod
     def submit(self, args: Args) -> Id:
         pass
+
+    def submit_many(self, args: Args, n: int) -> list[Id]:
+        """Submit `n` jobs with the same `args`, one at a time."""
+        return [self.submit(args) for _ in range(n)]
+
+
+class SbatchSubmitter(Submitter[OpenBoxTaskId, SlurmJobId]):
+    """Submitter of SLURM jobs with `sbatch`, many at once as job arrays."""
+
+    __cores: int
+
+    def __init__(self, cores: int = 1) -> None:
+        """Each job gets `cores` cores, one per evaluation loop."""
+        super().__init__()
+
+        self.__cores = cores
+
+    @property
+    def cores(self) -> int:
+        return self.__cores
+
+    @abstractmethod
+    def execute(self, command: str) -> str:
+        """Run `command` where SLURM commands are available, return stdout."""
+
+    @abstractmethod
+    def _sbatch_command(self, args: OpenBoxTaskId, options: str) -> str:
+        """Return the `sbatch` command line of a job, `options` included."""
+
+    @override
+    def submit(self, args: OpenBoxTaskId) -> SlurmJobId:
+        return self.__sbatch(args)
+
+    @override
+    def submit_many(self, args: OpenBoxTaskId, n: int) -> list[SlurmJobId]:
+        # Tasks of an array job are identified as "781422_0", "781422_1", ...
+        job_ids: list[SlurmJobId] = []
+        for offset in range(0, n, MAX_ARRAY_SIZE):
+            size: int = min(MAX_ARRAY_SIZE, n - offset)
+            job_id: SlurmJobId = self.__sbatch(args, f"--array=0-{size - 1}")
+            job_ids.extend(f"{job_id}_{i}" for i in range(size))
+
+        return job_ids
+
+    def __sbatch(self, args: OpenBoxTaskId, options: str = "") -> SlurmJobId:
+        stdout: str = self.execute(self._sbatch_command(args, options))
+
+        # `sbatch` prints "Submitted batch job 781422" to stdout
+        return "".join(filter(str.isnumeric, stdout))
+
+
+def log_output(command: str, stdout: str, stderr: str) -> None:
+    logger.debug("%s\nstdout: %s\nstderr: %s", command, stdout, stderr)
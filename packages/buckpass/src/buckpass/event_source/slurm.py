@@ -0,0 +1,137 @@
+from __future__ import annotations
+
+import time
+from typing import TYPE_CHECKING, Generic, Protocol, TypeVar
+
+from typing_extensions import override
+
+from buckpass.core.submitter import Submitter
+from buckpass.policy.batch import WorkerEvent
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+    from buckpass.core import SlurmJobId
+    from buckpass.core.policy import Policy
+
+Args = TypeVar("Args")
+
+# States `sacct` reports for jobs that ended without completing.
+FAILED_STATES: set[str] = {
+    "BOOT_FAIL",
+    "CANCELLED",
+    "DEADLINE",
+    "FAILED",
+    "NODE_FAIL",
+    "OUT_OF_MEMORY",
+    "PREEMPTED",
+    "TIMEOUT",
+}
+
+
+class SlurmSubmitter(Protocol[Args]):
+    def submit(self, args: Args) -> SlurmJobId: ...
+
+    def submit_many(self, args: Args, n: int) -> list[SlurmJobId]: ...
+
+    def execute(self, command: str) -> str: ...
+
+
+class SlurmEventSource(Submitter[Args, "SlurmJobId"], Generic[Args]):
+    """Submitter that turns state changes of its jobs into `WorkerEvent`s.
+
+    The state of every tracked job is read with a single `sacct` call per
+    poll, whatever the number of jobs.
+    """
+
+    __submitter: SlurmSubmitter[Args]
+    __states: dict[SlurmJobId, WorkerEvent | None]
+
+    def __init__(self, submitter: SlurmSubmitter[Args]) -> None:
+        super().__init__()
+
+        self.__submitter = submitter
+        self.__states = {}
+
+    @override
+    def submit(self, args: Args) -> SlurmJobId:
+        job_id: SlurmJobId = self.__submitter.submit(args)
+        self.__states[job_id] = None
+        return job_id
+
+    @override
+    def submit_many(self, args: Args, n: int) -> list[SlurmJobId]:
+        job_ids: list[SlurmJobId] = self.__submitter.submit_many(args, n)
+        for job_id in job_ids:
+            self.__states[job_id] = None
+        return job_ids
+
+    def execute(self, command: str) -> str:
+        return self.__submitter.execute(command)
+
+    def cancel(self, job_id: SlurmJobId) -> None:
+        """Cancel the job, the next poll reports it as failed."""
+        _ = self.__submitter.execute(f"scancel {job_id}")
+
+    def active(self) -> set[SlurmJobId]:
+        """Jobs pending or running at the last poll."""
+        return {
+            job_id
+            for job_id, state in self.__states.items()
+            if state in {None, WorkerEvent.START}
+        }
+
+    def poll(self) -> list[tuple[SlurmJobId, WorkerEvent]]:
+        active: set[SlurmJobId] = self.active()
+        if not active:
+            return []
+
+        # Array tasks are queried through their array job, pending tasks of
+        # an array are reported together (e.g. "781422_[4-999]") and ignored.
+        stdout: str = self.__submitter.execute(
+            "sacct -n -X -P -o JobID,State -j "
+            + ",".join(sorted({job_id.split("_", 1)[0] for job_id in active}))
+        )
+
+        events: list[tuple[SlurmJobId, WorkerEvent]] = []
+        for line in stdout.splitlines():
+            if line.count("|") != 1:
+                continue
+
+            (job_id, state) = line.split("|")
+            # e.g. "CANCELLED by 1000"
+            state = state.split()[0] if state.split() else ""
+            if job_id not in active:
+                continue
+
+            event: WorkerEvent | None = None
+            if state == "COMPLETED":
+                event = WorkerEvent.END
+            elif state in FAILED_STATES:
+                event = WorkerEvent.FAIL
+            elif state != "PENDING":
+                event = WorkerEvent.START
+
+            if event is None or event == self.__states[job_id]:
+                continue
+
+            # A job might have started and ended between two polls.
+            if self.__states[job_id] is None and event != WorkerEvent.START:
+                events.append((job_id, WorkerEvent.START))
+            events.append((job_id, event))
+            self.__states[job_id] = event
+
+        return events
+
+    def run(
+        self,
+        policy: Policy[tuple[SlurmJobId, WorkerEvent]],
+        interval: float = 30,
+        until: Callable[[], bool] | None = None,
+    ) -> None:
+        """Feed `policy` the events of a poll every `interval` seconds."""
+        while not (until() if until is not None else not self.active()):
+            time.sleep(interval)
+            for event in self.poll():
+                policy.update(event)
+            policy.tick()
@@ -0,0 +1,159 @@
+from __future__ import annotations
+
+import time
+from typing import TYPE_CHECKING, Generic, TypeVar
+
+from typing_extensions import override
+
+from buckpass.core.policy import Policy
+from buckpass.policy.batch import WorkerEvent
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+    from buckpass.core import IntGTZ
+    from buckpass.core.submitter import Submitter
+
+
+Id = TypeVar("Id")
+Args = TypeVar("Args")
+
+
+class AdaptivePolicy(Policy[tuple[Id, WorkerEvent]], Generic[Args, Id]):
+    """Like `BatchPolicy`, with between `min_size` and `max_size` workers.
+
+    The size grows by one each time a worker ends, and halves when workers
+    wait in the queue longer than they run (the cluster is congested). It
+    never exceeds the number of workers OpenBox can keep busy, that is the
+    rate at which it serves suggestions (per second, if `suggestion_rate`
+    is given, e.g. `buckpass.broker.suggestion_rate`; None if unknown)
+    times the duration of a worker. Queue waits and durations are
+    exponentially weighted moving averages.
+    """
+
+    __args: Args
+    __executions: IntGTZ
+    __min_size: IntGTZ
+    __max_size: IntGTZ
+    __submitter: Submitter[Args, Id]
+    __suggestion_rate: Callable[[], float | None] | None
+    __alpha: float
+    __clock: Callable[[], float]
+
+    __size: int
+    __queue_wait: float | None = None
+    __duration: float | None = None
+    __submit_times: dict[Id, float]
+    __start_times: dict[Id, float]
+    __resubmitted_workers: set[Id]
+    __completed_executions: int = 0
+
+    def __init__(
+        self,
+        args: Args,
+        executions: IntGTZ,
+        min_size: IntGTZ,
+        max_size: IntGTZ,
+        submitter: Submitter[Args, Id],
+        suggestion_rate: Callable[[], float | None] | None = None,
+        alpha: float = 0.2,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        super().__init__()
+        assert min_size <= max_size
+        assert 0 < alpha <= 1
+
+        self.__args = args
+        self.__executions = executions
+        self.__min_size = min_size
+        self.__max_size = max_size
+        self.__submitter = submitter
+        self.__suggestion_rate = suggestion_rate
+        self.__alpha = alpha
+        self.__clock = clock
+        self.__size = min_size
+        self.__submit_times = {}
+        self.__start_times = {}
+        self.__resubmitted_workers = set()
+
+        self.__fill()
+
+    @property
+    def size(self) -> int:
+        return self.__size
+
+    def resubmit(self, args: Args) -> Id:
+        """Submit a worker with `args`, e.g. for the configs of a cancelled one.
+
+        It takes the place of a worker in the batch, but its end does not count
+        as an execution.
+        """
+        worker_id: Id = self.__submitter.submit(args)
+        self.__submit_times[worker_id] = self.__clock()
+        self.__resubmitted_workers.add(worker_id)
+        return worker_id
+
+    @override
+    def update(self, event: tuple[Id, WorkerEvent]) -> None:
+        (worker_id, worker_event) = event
+        now: float = self.__clock()
+
+        match worker_event:
+            case WorkerEvent.START:
+                if worker_id in self.__submit_times:
+                    self.__queue_wait = self.__average(
+                        self.__queue_wait,
+                        now - self.__submit_times.pop(worker_id),
+                    )
+                    self.__start_times[worker_id] = now
+            case WorkerEvent.END | WorkerEvent.FAIL:
+                _ = self.__submit_times.pop(worker_id, None)
+                if worker_id in self.__start_times:
+                    self.__duration = self.__average(
+                        self.__duration, now - self.__start_times.pop(worker_id)
+                    )
+                if worker_id in self.__resubmitted_workers:
+                    self.__resubmitted_workers.remove(worker_id)
+                elif worker_event == WorkerEvent.END:
+                    self.__completed_executions += 1
+                    self.__resize()
+
+        self.__fill()
+
+    def __average(self, average: float | None, sample: float) -> float:
+        if average is None:
+            return sample
+        return self.__alpha * sample + (1 - self.__alpha) * average
+
+    def __resize(self) -> None:
+        size: int = self.__size + 1
+        if (
+            self.__queue_wait is not None
+            and self.__duration is not None
+            and self.__queue_wait > self.__duration
+        ):
+            size = self.__size // 2
+
+        rate: float | None = (
+            None if self.__suggestion_rate is None else self.__suggestion_rate()
+        )
+        if rate is not None and self.__duration is not None:
+            size = min(size, int(rate * self.__duration) + 1)
+
+        self.__size = max(self.__min_size, min(self.__max_size, size))
+
+    def __fill(self) -> None:
+        if self.__completed_executions >= self.__executions:
+            return
+
+        for worker_id in self.__submitter.submit_many(
+            self.__args,
+            self.__size - len(self.__submit_times) - len(self.__start_times),
+        ):
+            self.__submit_times[worker_id] = self.__clock()
+
+    def is_completed(self) -> bool:
+        return (
+            len(self.__submit_times) == 0
+            and self.__completed_executions >= self.__executions
+        )
@@ -30,6 +30,7 @@ class BatchPolicy(Policy[tuple[Id, WorkerEvent]], Generic[Args, Id]):
 
     __waiting_workers: set[Id]
     __running_workers: set[Id]
+    __resubmitted_workers: set[Id]
     __completed_executions: int = 0
 
     def __init__(
@@ -47,9 +48,21 @@ class BatchPolicy(Policy[tuple[Id, WorkerEvent]], Generic[Args, Id]):
         self.__submitter = submitter
         self.__waiting_workers = set()
         self.__running_workers = set()
+        self.__resubmitted_workers = set()
 
         self.__fill()
 
+    def resubmit(self, args: Args) -> Id:
+        """Submit a worker with `args`, e.g. for the configs of a cancelled one.
+
+        It takes the place of a worker in the batch, but its end does not count
+        as an execution.
+        """
+        worker_id: Id = self.__submitter.submit(args)
+        self.__waiting_workers.add(worker_id)
+        self.__resubmitted_workers.add(worker_id)
+        return worker_id
+
     @override
     def update(self, event: tuple[Id, WorkerEvent]) -> None:
         (worker_id, worker_event) = event
@@ -64,23 +77,32 @@ class BatchPolicy(Policy[tuple[Id, WorkerEvent]], Generic[Args, Id]):
                     self.__waiting_workers.remove(worker_id)
                 if worker_id in self.__running_workers:
                     self.__running_workers.remove(worker_id)
-                self.__completed_executions += 1
+                if worker_id in self.__resubmitted_workers:
+                    self.__resubmitted_workers.remove(worker_id)
+                else:
+                    self.__completed_executions += 1
             case WorkerEvent.FAIL:
                 if worker_id in self.__waiting_workers:
                     self.__waiting_workers.remove(worker_id)
                 if worker_id in self.__running_workers:
                     self.__running_workers.remove(worker_id)
+                if worker_id in self.__resubmitted_workers:
+                    self.__resubmitted_workers.remove(worker_id)
 
         self.__fill()
 
     def __fill(self) -> None:
-        while (
-            len(self.__waiting_workers) + len(self.__running_workers)
-            < self.__size
-            and self.__completed_executions < self.__executions
-        ):
-            worker_id = self.__submitter.submit(self.__args)
-            self.__waiting_workers.add(worker_id)
+        if self.__completed_executions >= self.__executions:
+            return
+
+        self.__waiting_workers.update(
+            self.__submitter.submit_many(
+                self.__args,
+                self.__size
+                - len(self.__waiting_workers)
+                - len(self.__running_workers),
+            )
+        )
 
     def is_completed(self) -> bool:
         return (
@@ -21,8 +21,7 @@ class BurstPolicy(Policy[None], Generic[Args, Id]):
     ) -> None:
         super().__init__()
 
-        for _ in range(size):
-            _ = submitter.submit(args)
+        _ = submitter.submit_many(args, size)
 
     @override
     def update(self, event: None) -> None: ...
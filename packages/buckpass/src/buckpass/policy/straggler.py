@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+import statistics
+import time
+from typing import TYPE_CHECKING, Generic, TypeVar
+
+from typing_extensions import override
+
+from buckpass.core.policy import Policy
+from buckpass.policy.batch import WorkerEvent
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+
+Id = TypeVar("Id")
+
+
+class StragglerPolicy(Policy[tuple[Id, WorkerEvent]], Generic[Id]):
+    """Wrap `policy`, cancelling the workers that run for far too long.
+
+    A worker is a straggler when it has been running for longer than the
+    median duration of the completed workers plus `factor` times their
+    median absolute deviation, or plus `margin` seconds if more (and at
+    least `min_duration` seconds), once `warmup` workers have completed. It
+    is cancelled with `cancel`, then `mitigate` (e.g. resubmitting its
+    config, or reporting a timeout) is called with its id. Events are
+    forwarded to `policy`, the cancelled worker is reported as failed by its
+    event source.
+
+    Durations measured by polling are multiples of the poll interval, so
+    their deviation is often 0: `margin` should be a few poll intervals.
+    """
+
+    __policy: Policy[tuple[Id, WorkerEvent]]
+    __cancel: Callable[[Id], None]
+    __mitigate: Callable[[Id], None] | None
+    __factor: float
+    __warmup: int
+    __margin: float
+    __min_duration: float
+    __clock: Callable[[], float]
+
+    __start_times: dict[Id, float]
+    __durations: list[float]
+    __stragglers: set[Id]
+
+    def __init__(
+        self,
+        policy: Policy[tuple[Id, WorkerEvent]],
+        cancel: Callable[[Id], None],
+        mitigate: Callable[[Id], None] | None = None,
+        factor: float = 5,
+        warmup: int = 5,
+        margin: float = 0,
+        min_duration: float = 0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        super().__init__()
+
+        self.__policy = policy
+        self.__cancel = cancel
+        self.__mitigate = mitigate
+        self.__factor = factor
+        self.__warmup = warmup
+        self.__margin = margin
+        self.__min_duration = min_duration
+        self.__clock = clock
+        self.__start_times = {}
+        self.__durations = []
+        self.__stragglers = set()
+
+    @property
+    def stragglers(self) -> set[Id]:
+        return set(self.__stragglers)
+
+    @override
+    def update(self, event: tuple[Id, WorkerEvent]) -> None:
+        (worker_id, worker_event) = event
+
+        match worker_event:
+            case WorkerEvent.START:
+                self.__start_times[worker_id] = self.__clock()
+            case WorkerEvent.END:
+                if worker_id in self.__start_times:
+                    self.__durations.append(
+                        self.__clock() - self.__start_times.pop(worker_id)
+                    )
+            case WorkerEvent.FAIL:
+                _ = self.__start_times.pop(worker_id, None)
+
+        self.__policy.update(event)
+
+    @override
+    def tick(self) -> None:
+        threshold: float | None = self.threshold()
+        if threshold is not None:
+            now: float = self.__clock()
+            for worker_id, start_time in list(self.__start_times.items()):
+                if now - start_time > threshold:
+                    _ = self.__start_times.pop(worker_id)
+                    self.__stragglers.add(worker_id)
+                    self.__cancel(worker_id)
+                    if self.__mitigate is not None:
+                        self.__mitigate(worker_id)
+
+        self.__policy.tick()
+
+    def threshold(self) -> float | None:
+        """Return the running time of stragglers, None during the warmup."""
+        if len(self.__durations) < self.__warmup:
+            return None
+
+        median: float = statistics.median(self.__durations)
+        deviation: float = statistics.median(
+            abs(duration - median) for duration in self.__durations
+        )
+        return max(
+            self.__min_duration,
+            median + max(self.__factor * deviation, self.__margin),
+        )
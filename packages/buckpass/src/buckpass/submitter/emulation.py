@@ -2,31 +2,35 @@ import subprocess
 
 from typing_extensions import override
 
-from buckpass.core import OpenBoxTaskId, SlurmJobId
-from buckpass.core.submitter import Submitter
+from buckpass.core import OpenBoxTaskId
+from buckpass.core.ssh import control_options, open_master
+from buckpass.core.submitter import SbatchSubmitter, log_output
 
 
-class EmulationSubmitter(Submitter[OpenBoxTaskId, SlurmJobId]):
+class EmulationSubmitter(SbatchSubmitter):
     @override
-    def submit(self, args: OpenBoxTaskId) -> SlurmJobId:
+    def execute(self, command: str) -> str:
+        """Run `command` on the SLURM controller, return its stdout."""
+        ssh: list[str] = [
+            "/usr/bin/sshpass",
+            "-p",
+            "root",
+            "ssh",
+            "-o",
+            "StrictHostKeyChecking=no",
+        ]
+        open_master(ssh, "slurmctld")
         completed_process = subprocess.run(
-            [
-                "/usr/bin/sshpass",
-                "-p",
-                "root",
-                "ssh",
-                "-o",
-                "StrictHostKeyChecking=no",
-                "slurmctld",
-                f'""sbatch /data/job.sh {args}""',
-            ],
+            [*ssh, *control_options(), "slurmctld", f'""{command}""'],
             check=False,
             capture_output=True,
         )
 
         stdout: str = completed_process.stdout.decode()
-        stderr: str = completed_process.stderr.decode()
-        print(stdout, stderr, sep="\n")
+        log_output(command, stdout, completed_process.stderr.decode())
 
-        # `sbatch` prints "Submitted batch job 781422" to stdout
-        return "".join(filter(str.isnumeric, stdout))
+        return stdout
+
+    @override
+    def _sbatch_command(self, args: OpenBoxTaskId, options: str) -> str:
+        return f"sbatch -c {self.cores} {options} /data/job.sh {args}"
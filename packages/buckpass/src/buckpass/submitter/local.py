@@ -0,0 +1,144 @@
+from __future__ import annotations
+
+import contextlib
+import itertools
+import os
+import queue
+import shlex
+import subprocess
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from typing_extensions import override
+
+from buckpass.core.submitter import Submitter
+from buckpass.policy.batch import WorkerEvent
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+    from buckpass.core.policy import Policy
+
+LocalJobId = str
+
+
+class LocalSubmitter(Submitter[str, LocalJobId]):
+    """Run `command` and the submitted args as local processes.
+
+    At most `max_workers` processes run at a time, the others wait in a
+    queue.
+    Each job reports a START event when its process starts, then END or
+    FAIL depending on its exit code, `run` feeds them to a policy. A job
+    whose process cannot be started reports FAIL alone, then no more jobs
+    are submitted: they would fail the same way.
+    """
+
+    __command: list[str]
+    __env: dict[str, str]
+    __executor: ThreadPoolExecutor
+    __events: queue.Queue[tuple[LocalJobId, WorkerEvent]]
+    __counter: itertools.count[int]
+    __lock: threading.Lock
+    __active: set[LocalJobId]
+    __processes: dict[LocalJobId, subprocess.Popen[bytes]]
+    __error: OSError | None = None
+
+    def __init__(
+        self,
+        command: list[str],
+        max_workers: int,
+        env: dict[str, str] | None = None,
+    ) -> None:
+        super().__init__()
+
+        self.__command = command
+        self.__env = os.environ | (env or {})
+        self.__executor = ThreadPoolExecutor(max_workers=max_workers)
+        self.__events = queue.Queue()
+        self.__counter = itertools.count()
+        self.__lock = threading.Lock()
+        self.__active = set()
+        self.__processes = {}
+
+    @override
+    def submit(self, args: str) -> LocalJobId:
+        if self.__error is not None:
+            msg = f"cannot start {self.__command}"
+            raise RuntimeError(msg) from self.__error
+
+        job_id: LocalJobId = f"local_{next(self.__counter)}"
+        with self.__lock:
+            self.__active.add(job_id)
+        _ = self.__executor.submit(self.__run, job_id, args)
+        return job_id
+
+    def execute(self, command: str) -> str:
+        """Run `command` in a shell from the home directory, return stdout."""
+        return subprocess.run(  # noqa: S602
+            command,
+            shell=True,
+            cwd=Path.home(),
+            env=self.__env,
+            check=False,
+            capture_output=True,
+            text=True,
+        ).stdout
+
+    def cancel(self, job_id: LocalJobId) -> None:
+        with self.__lock:
+            process = self.__processes.get(job_id)
+        if process is not None:
+            process.kill()
+
+    def active(self) -> set[LocalJobId]:
+        """Jobs waiting or running."""
+        with self.__lock:
+            return set(self.__active)
+
+    def run(
+        self,
+        policy: Policy[tuple[LocalJobId, WorkerEvent]],
+        interval: float = 1,
+        until: Callable[[], bool] | None = None,
+    ) -> None:
+        """Feed `policy` the events of the jobs as they happen."""
+        while not (
+            until()
+            if until is not None
+            else not self.active() and self.__events.empty()
+        ):
+            with contextlib.suppress(queue.Empty):
+                policy.update(self.__events.get(timeout=interval))
+            policy.tick()
+
+    def wait(self) -> None:
+        """Wait until no job is waiting or running."""
+        self.__executor.shutdown(wait=True)
+
+    def __run(self, job_id: LocalJobId, args: str) -> None:
+        event: WorkerEvent = WorkerEvent.FAIL
+        try:
+            try:
+                process = subprocess.Popen(
+                    [*self.__command, *shlex.split(args)],
+                    env=self.__env | {"BUCKPASS_JOB_ID": job_id},
+                )
+            except OSError as exception:
+                self.__error = exception
+                return
+
+            with self.__lock:
+                self.__processes[job_id] = process
+            self.__events.put((job_id, WorkerEvent.START))
+
+            if process.wait() == 0:
+                event = WorkerEvent.END
+        finally:
+            # The event is queued before the job stops being active, so that
+            # `run` does not return before seeing it.
+            self.__events.put((job_id, event))
+            with self.__lock:
+                _ = self.__processes.pop(job_id, None)
+                self.__active.discard(job_id)
@@ -1,34 +1,53 @@
 import os
+import shlex
 import subprocess
 
 from typing_extensions import override
 
-from buckpass.core import OpenBoxTaskId, SlurmJobId
-from buckpass.core.submitter import Submitter
+from buckpass.core import OpenBoxTaskId
+from buckpass.core.ssh import control_options, open_master, open_master_command
+from buckpass.core.submitter import SbatchSubmitter, log_output
 
 
-class Uniroma1Submitter(Submitter[OpenBoxTaskId, SlurmJobId]):
+class Uniroma1Submitter(SbatchSubmitter):
     @override
-    def submit(self, args: OpenBoxTaskId) -> SlurmJobId:
-        job_name = "_".join(
-            reversed(args.replace("-t ", "").replace("-e ", "").split())
-        )
+    def execute(self, command: str) -> str:
+        """Run `command` on the submitter node, return its stdout.
 
+        Both hops (to the frontend, then to the submitter node) go through a
+        master connection, see `buckpass.core.ssh`.
+        """
+        ssh: list[str] = ["/usr/bin/ssh", "-i", "~/.ssh/Uniroma1Cluster"]
+        frontend: str = (
+            f"{os.getenv('CLUSTER_USER')}@{os.getenv('FRONTEND_HOST')}"
+        )
+        open_master(ssh, frontend)
         completed_process = subprocess.run(
             [
-                "/usr/bin/ssh",
-                "-i",
-                "~/.ssh/Uniroma1Cluster",
-                f"{os.getenv('CLUSTER_USER')}@{os.getenv('FRONTEND_HOST')}",
-                f'""ssh submitter \\\\"sbatch -J {job_name} -c 1 /home/{os.getenv("CLUSTER_USER")}/{os.getenv("PROJECT_PATH")}/src/job.sh {args}\\\\" ""',
+                *ssh,
+                *control_options(),
+                frontend,
+                # The frontend's shell unquotes `command`, the submitter's
+                # runs it.
+                (
+                    f"{open_master_command(['ssh'], 'submitter')};"
+                    f" ssh {shlex.join(control_options())} submitter"
+                    f" {shlex.quote(command)}"
+                ),
             ],
             check=False,
             capture_output=True,
         )
 
         stdout: str = completed_process.stdout.decode()
-        stderr: str = completed_process.stderr.decode()
-        print(stdout, stderr, sep="\n")
+        log_output(command, stdout, completed_process.stderr.decode())
+
+        return stdout
+
+    @override
+    def _sbatch_command(self, args: OpenBoxTaskId, options: str) -> str:
+        job_name = "_".join(
+            reversed(args.replace("-t ", "").replace("-e ", "").split())
+        )
 
-        # `sbatch` prints "Submitted batch job 781422" to stdout
-        return "".join(filter(str.isnumeric, stdout))
+        return f"sbatch -J {job_name} -c {self.cores} {options} /home/{os.getenv('CLUSTER_USER')}/{os.getenv('PROJECT_PATH')}/src/job.sh {args}"
@@ -0,0 +1,112 @@
+import contextlib
+import json
+import threading
+import time
+from collections.abc import Iterator
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+from urllib.parse import parse_qs
+
+import pytest
+from buckpass.core.openbox_api import URL
+
+
+class Clock:
+    """Stand-in for `time.monotonic`, it only moves when `now` is set."""
+
+    def __init__(self) -> None:
+        self.now: float = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock() -> Clock:
+    return Clock()
+
+
+class OpenBox:
+    """Stand-in OpenBox server, it serves `max_runs` suggestions."""
+
+    def __init__(self, max_runs: int) -> None:
+        self.max_runs: int = max_runs
+        self.delay: float = 0.0
+        self.observation_delay: float = 0.0
+        self.failures: int = 0
+        self.rejected_configs: list[Any] = []
+        self.suggestions: int = 0
+        self.observations: list[dict[str, Any]] = []
+        self.requests: int = 0
+        self.in_flight: int = 0
+        self.max_in_flight: int = 0
+        self.lock: threading.Lock = threading.Lock()
+
+    def handle(self, endpoint: str, data: dict[str, str]) -> tuple[int, Any]:
+        with self.lock:
+            self.requests += 1
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            time.sleep(self.delay)
+            with self.lock:
+                if self.failures > 0:
+                    self.failures -= 1
+                    return (500, {})
+
+                if endpoint == "get_suggestion/":
+                    if self.suggestions >= self.max_runs:
+                        return (200, {"code": 0, "msg": "no suggestion left"})
+                    self.suggestions += 1
+                    return (
+                        200,
+                        {
+                            "code": 1,
+                            "res": json.dumps({"k": float(self.suggestions)}),
+                        },
+                    )
+
+            time.sleep(self.observation_delay)
+            with self.lock:
+                if json.loads(data["config"]) in self.rejected_configs:
+                    return (200, {"code": 0, "msg": "rejected"})
+                self.observations.append(data)
+            return (200, {"code": 1})
+        finally:
+            with self.lock:
+                self.in_flight -= 1
+
+
+@pytest.fixture
+def openbox() -> Iterator[tuple[OpenBox, URL]]:
+    state: OpenBox = OpenBox(max_runs=20)
+
+    class _Handler(BaseHTTPRequestHandler):
+        def do_POST(self) -> None:
+            body: bytes = self.rfile.read(
+                int(self.headers.get("Content-Length", 0))
+            )
+            (status, response) = state.handle(
+                self.path.removeprefix("/bo_advice/"),
+                {
+                    key: values[0]
+                    for key, values in parse_qs(body.decode()).items()
+                },
+            )
+            content: bytes = json.dumps(response).encode()
+            # The client is gone after a read timeout.
+            with contextlib.suppress(ConnectionError):
+                self.send_response(status)
+                self.send_header("Content-Length", str(len(content)))
+                self.end_headers()
+                _ = self.wfile.write(content)
+
+        def log_message(self, format: str, *args: Any) -> None:
+            pass
+
+    server = ThreadingHTTPServer(("localhost", 0), _Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield (state, URL(host="localhost", port=server.server_address[1]))
+    server.shutdown()
+    server.server_close()
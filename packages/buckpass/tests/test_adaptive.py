@@ -0,0 +1,150 @@
+from __future__ import annotations
+
+import itertools
+from typing import TYPE_CHECKING
+
+from buckpass.core import IntGTZ
+from buckpass.policy.adaptive import AdaptivePolicy
+from buckpass.policy.batch import WorkerEvent
+
+if TYPE_CHECKING:
+    from conftest import Clock
+
+
+class _Submitter:
+    def __init__(self) -> None:
+        self.submitted: list[int] = []
+        self.runs: int = 0
+        self.__job_ids = itertools.count()
+
+    def submit(self, args: str) -> int:
+        return self.submit_many(args, 1)[0]
+
+    def submit_many(self, args: str, n: int) -> list[int]:
+        job_ids: list[int] = [next(self.__job_ids) for _ in range(n)]
+        self.submitted.extend(job_ids)
+        return job_ids
+
+
+def _run(
+    policy: AdaptivePolicy[str, int],
+    clock: Clock,
+    submitter: _Submitter,
+    queue_wait: float,
+    duration: float,
+) -> None:
+    """Start the queued workers after `queue_wait`, end them `duration` later."""
+    job_ids: list[int] = submitter.submitted[submitter.runs :]
+    submitter.runs = len(submitter.submitted)
+    clock.now += queue_wait
+    for job_id in job_ids:
+        policy.update((job_id, WorkerEvent.START))
+    clock.now += duration
+    for job_id in job_ids:
+        policy.update((job_id, WorkerEvent.END))
+
+
+def test_size_grows_as_workers_end(clock: Clock) -> None:
+    submitter: _Submitter = _Submitter()
+    policy: AdaptivePolicy[str, int] = AdaptivePolicy(
+        args="-t task",
+        executions=IntGTZ(100),
+        min_size=IntGTZ(1),
+        max_size=IntGTZ(4),
+        submitter=submitter,
+        clock=clock,
+    )
+    assert submitter.submitted == [0]
+
+    for size in (2, 4, 4):
+        _run(policy, clock, submitter, 1, 10)
+        assert policy.size == size
+        assert len(submitter.submitted) - submitter.runs == size
+
+
+def test_size_halves_when_the_queue_is_congested(clock: Clock) -> None:
+    submitter: _Submitter = _Submitter()
+    policy: AdaptivePolicy[str, int] = AdaptivePolicy(
+        args="-t task",
+        executions=IntGTZ(100),
+        min_size=IntGTZ(2),
+        max_size=IntGTZ(8),
+        submitter=submitter,
+        alpha=1,
+        clock=clock,
+    )
+    _run(policy, clock, submitter, 1, 10)
+    assert policy.size == 4
+
+    _run(policy, clock, submitter, 100, 10)
+    assert policy.size == 2
+
+
+def test_size_is_capped_by_the_suggestion_rate(clock: Clock) -> None:
+    submitter: _Submitter = _Submitter()
+    rate: list[float | None] = [None]
+    policy: AdaptivePolicy[str, int] = AdaptivePolicy(
+        args="-t task",
+        executions=IntGTZ(100),
+        min_size=IntGTZ(1),
+        max_size=IntGTZ(8),
+        submitter=submitter,
+        suggestion_rate=lambda: rate[0],
+        alpha=1,
+        clock=clock,
+    )
+    _run(policy, clock, submitter, 1, 10)
+    assert policy.size == 2
+
+    # OpenBox serves a suggestion every 10 seconds, 2 workers of 10 seconds
+    # keep it busy.
+    rate[0] = 0.1
+    _run(policy, clock, submitter, 1, 10)
+    assert policy.size == 2
+
+    rate[0] = None
+    _run(policy, clock, submitter, 1, 10)
+    assert policy.size == 4
+
+
+def test_queued_workers_run_once_the_executions_are_completed(
+    clock: Clock,
+) -> None:
+    submitter: _Submitter = _Submitter()
+    policy: AdaptivePolicy[str, int] = AdaptivePolicy(
+        args="-t task",
+        executions=IntGTZ(2),
+        min_size=IntGTZ(2),
+        max_size=IntGTZ(2),
+        submitter=submitter,
+        clock=clock,
+    )
+    _run(policy, clock, submitter, 1, 10)
+    assert not policy.is_completed()
+
+    _run(policy, clock, submitter, 1, 10)
+    assert policy.is_completed()
+    assert submitter.submitted == [0, 1, 2]
+
+
+def test_resubmitted_workers_do_not_count_as_executions(clock: Clock) -> None:
+    submitter: _Submitter = _Submitter()
+    policy: AdaptivePolicy[str, int] = AdaptivePolicy(
+        args="-t task",
+        executions=IntGTZ(1),
+        min_size=IntGTZ(1),
+        max_size=IntGTZ(1),
+        submitter=submitter,
+        clock=clock,
+    )
+    policy.update((0, WorkerEvent.START))
+    # Worker 0 is cancelled, its config resubmitted, then it is reported as
+    # failed: the resubmitted worker takes its place.
+    assert policy.resubmit("-t task -c trials/0.0.json") == 1
+    policy.update((0, WorkerEvent.FAIL))
+    submitter.runs = 1
+    assert submitter.submitted == [0, 1]
+
+    _run(policy, clock, submitter, 1, 10)
+    assert not policy.is_completed()
+    assert submitter.submitted == [0, 1, 2]
@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import json
+import time
+from typing import TYPE_CHECKING, Any
+
+from buckpass.broker import Broker
+from buckpass.core.openbox_api import URL
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    from conftest import OpenBox
+
+
+def _observation(k: float) -> dict[str, Any]:
+    """Return an observation as the workers post it to the broker."""
+    return {
+        "task_id": "task",
+        "config": json.dumps({"k": k}),
+        "objectives": json.dumps([k]),
+        "trial_info": json.dumps({}),
+        "trial_state": "0",
+    }
+
+
+def _wait(condition: Any, timeout: float = 5) -> bool:
+    deadline: float = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+
+def test_suggestions_and_observations_go_through(
+    openbox: tuple[OpenBox, URL], tmp_path: Path
+) -> None:
+    (state, url) = openbox
+    state.max_runs = 3
+    broker: Broker = Broker(url, failed_path=tmp_path / "failed.jsonl")
+
+    suggestions: list[Any] = []
+    while (suggestion := broker.get_suggestion("task")) is not None:
+        suggestions.append(suggestion)
+        broker.update_observation(_observation(suggestion["k"]))
+    broker.update_observation(_observation(1.0) | {"idempotency_key": "a"})
+    broker.update_observation(_observation(1.0) | {"idempotency_key": "a"})
+    broker.close()
+
+    # Suggestions are prefetched concurrently, in any order.
+    assert sorted(suggestion["k"] for suggestion in suggestions) == [1, 2, 3]
+    assert [
+        json.loads(observation["objectives"])
+        for observation in state.observations
+    ] == [[suggestion["k"]] for suggestion in suggestions] + [[1.0]]
+    assert broker.suggestion_rate("task") is not None
+    assert not (tmp_path / "failed.jsonl").exists()
+
+
+def test_rejected_observations_do_not_hold_up_the_others(
+    openbox: tuple[OpenBox, URL], tmp_path: Path
+) -> None:
+    (state, url) = openbox
+    state.rejected_configs = [{"k": 1.0}]
+    broker: Broker = Broker(url, failed_path=tmp_path / "failed.jsonl")
+
+    broker.update_observation(_observation(1.0))
+    broker.update_observation(_observation(2.0))
+
+    assert _wait(lambda: len(state.observations) == 1)
+    assert json.loads(state.observations[0]["config"]) == {"k": 2.0}
+    broker.close()
+    assert [
+        json.loads(line)
+        for line in (tmp_path / "failed.jsonl").read_text().splitlines()
+    ] == [_observation(1.0)]
+
+
+def test_server_errors_are_retried(
+    openbox: tuple[OpenBox, URL], tmp_path: Path
+) -> None:
+    (state, url) = openbox
+    state.failures = 2
+    broker: Broker = Broker(
+        url, failed_path=tmp_path / "failed.jsonl", max_backoff=0.01
+    )
+
+    broker.update_observation(_observation(1.0))
+
+    assert _wait(lambda: len(state.observations) == 1)
+    broker.close()
+    assert state.requests == 3
+    assert not (tmp_path / "failed.jsonl").exists()
+
+
+def test_unsent_observations_are_persisted_on_close(tmp_path: Path) -> None:
+    # Nothing listens on port 1.
+    broker: Broker = Broker(
+        URL(host="localhost", port=1),
+        failed_path=tmp_path / "failed.jsonl",
+        max_backoff=0.01,
+    )
+    broker.update_observation(_observation(1.0))
+    broker.update_observation(_observation(2.0))
+    time.sleep(0.1)
+    broker.close()
+
+    assert [
+        json.loads(line)
+        for line in (tmp_path / "failed.jsonl").read_text().splitlines()
+    ] == [_observation(1.0), _observation(2.0)]
@@ -0,0 +1,71 @@
+import sys
+
+import pytest
+from buckpass.core import IntGTZ
+from buckpass.core.policy import Policy
+from buckpass.policy.batch import BatchPolicy, WorkerEvent
+from buckpass.submitter.local import LocalSubmitter
+
+# Exits with the code it is given.
+_EXIT: list[str] = [
+    sys.executable,
+    "-c",
+    "import sys; sys.exit(int(sys.argv[1]))",
+]
+
+
+class _Recorder(Policy[tuple[str, WorkerEvent]]):
+    """Keep the events fed to `policy`, if any."""
+
+    def __init__(
+        self, policy: Policy[tuple[str, WorkerEvent]] | None = None
+    ) -> None:
+        super().__init__()
+        self.policy: Policy[tuple[str, WorkerEvent]] | None = policy
+        self.events: list[tuple[str, WorkerEvent]] = []
+
+    def update(self, event: tuple[str, WorkerEvent]) -> None:
+        self.events.append(event)
+        if self.policy is not None:
+            self.policy.update(event)
+
+
+def test_exit_codes_become_events() -> None:
+    submitter: LocalSubmitter = LocalSubmitter(_EXIT, max_workers=2)
+    succeeding: str = submitter.submit("0")
+    failing: str = submitter.submit("1")
+    recorder: _Recorder = _Recorder()
+    submitter.run(recorder, interval=0.01)
+
+    assert sorted(recorder.events) == sorted(
+        [
+            (succeeding, WorkerEvent.START),
+            (succeeding, WorkerEvent.END),
+            (failing, WorkerEvent.START),
+            (failing, WorkerEvent.FAIL),
+        ]
+    )
+    assert recorder.events.index((failing, WorkerEvent.START)) < (
+        recorder.events.index((failing, WorkerEvent.FAIL))
+    )
+
+
+def test_jobs_that_cannot_start_are_not_resubmitted() -> None:
+    submitter: LocalSubmitter = LocalSubmitter(
+        ["/nonexistent/worker"], max_workers=1
+    )
+    recorder: _Recorder = _Recorder()
+
+    # Even the first batch might not be submitted in full.
+    with pytest.raises(RuntimeError, match="cannot start"):
+        recorder.policy = BatchPolicy(
+            args="-t task",
+            executions=IntGTZ(100),
+            size=IntGTZ(2),
+            submitter=submitter,
+        )
+        submitter.run(recorder, interval=0.01)
+    submitter.wait()
+
+    assert recorder.events in ([], [("local_0", WorkerEvent.FAIL)])
+    assert not submitter.active()
@@ -0,0 +1,122 @@
+from __future__ import annotations
+
+import asyncio
+import json
+from typing import TYPE_CHECKING
+
+import pytest
+import requests
+from buckpass.core.openbox_api import (
+    URL,
+    AsyncOpenBoxClient,
+    NoSuggestionError,
+    ObservationRejectedError,
+    OpenBoxClient,
+)
+
+if TYPE_CHECKING:
+    from conftest import OpenBox
+
+
+def test_async_client_runs_trials_concurrently(
+    openbox: tuple[OpenBox, URL],
+) -> None:
+    (state, url) = openbox
+    state.delay = 0.05
+    client = AsyncOpenBoxClient(url, concurrency=4)
+
+    async def _trials() -> int:
+        evaluations: int = 0
+        while True:
+            try:
+                config = await client.get_suggestion("task")
+            except NoSuggestionError:
+                return evaluations
+            await client.update_observation(
+                "task", config, [config["k"]], trial_info={}
+            )
+            evaluations += 1
+
+    async def _main() -> list[int]:
+        return await asyncio.gather(*(_trials() for _ in range(8)))
+
+    evaluations: list[int] = asyncio.run(_main())
+
+    assert sum(evaluations) == state.max_runs
+    assert sorted(
+        json.loads(observation["config"])["k"]
+        for observation in state.observations
+    ) == [float(run) for run in range(1, state.max_runs + 1)]
+    assert 1 < state.max_in_flight <= 4
+
+
+def test_identical_observations_are_all_sent(
+    openbox: tuple[OpenBox, URL],
+) -> None:
+    (state, url) = openbox
+    client = OpenBoxClient(url)
+
+    for _ in range(2):
+        client.update_observation("task", {"k": 1.0}, [0.5])
+    assert len(state.observations) == 2
+
+    for _ in range(2):
+        client.update_observation(
+            "task", {"k": 1.0}, [0.5], idempotency_key="trial"
+        )
+    assert len(state.observations) == 3
+    assert state.observations[-1]["idempotency_key"] == "trial"
+
+
+def test_only_the_last_idempotency_keys_are_kept(
+    openbox: tuple[OpenBox, URL],
+) -> None:
+    (state, url) = openbox
+    client = OpenBoxClient(url, idempotency_keys=2)
+
+    for key in ("first", "second", "third", "first", "third"):
+        client.update_observation(
+            "task", {"k": 1.0}, [0.5], idempotency_key=key
+        )
+    assert [
+        observation["idempotency_key"] for observation in state.observations
+    ] == ["first", "second", "third", "first"]
+
+
+def test_rejected_observations_raise(openbox: tuple[OpenBox, URL]) -> None:
+    (state, url) = openbox
+    state.rejected_configs = [{"k": 1.0}]
+    client = OpenBoxClient(url, retries=3, backoff=0.01)
+
+    with pytest.raises(ObservationRejectedError):
+        client.update_observation(
+            "task", {"k": 1.0}, [0.5], idempotency_key="trial"
+        )
+    # A rejected observation is not taken as sent.
+    state.rejected_configs.clear()
+    client.update_observation(
+        "task", {"k": 1.0}, [0.5], idempotency_key="trial"
+    )
+    assert state.requests == 2
+    assert len(state.observations) == 1
+
+
+def test_server_errors_are_retried(openbox: tuple[OpenBox, URL]) -> None:
+    (state, url) = openbox
+    state.failures = 2
+    client = OpenBoxClient(url, retries=2, backoff=0.01)
+
+    assert client.get_suggestion("task") == {"k": 1.0}
+    assert state.requests == 3
+
+
+def test_observations_are_not_retried_after_a_read_timeout(
+    openbox: tuple[OpenBox, URL],
+) -> None:
+    (state, url) = openbox
+    state.observation_delay = 0.5
+    client = OpenBoxClient(url, read_timeout=0.1, retries=3, backoff=0.01)
+
+    with pytest.raises(requests.ReadTimeout):
+        client.update_observation("task", {"k": 1.0}, [0.5])
+    assert state.requests == 1
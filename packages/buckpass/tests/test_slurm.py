@@ -0,0 +1,145 @@
+import itertools
+
+from buckpass.core import IntGTZ
+from buckpass.event_source.slurm import SlurmEventSource
+from buckpass.policy.batch import BatchPolicy, WorkerEvent
+
+
+class _Slurm:
+    """Stand-in for a SLURM submitter, `states` are what `sacct` reports."""
+
+    def __init__(self) -> None:
+        self.states: dict[str, str] = {}
+        self.commands: list[str] = []
+        self.__job_ids = itertools.count(1)
+
+    def submit(self, args: str) -> str:
+        job_id: str = str(next(self.__job_ids))
+        self.states[job_id] = "PENDING"
+        return job_id
+
+    def submit_many(self, args: str, n: int) -> list[str]:
+        array_id: int = next(self.__job_ids)
+        job_ids: list[str] = [f"{array_id}_{i}" for i in range(n)]
+        for job_id in job_ids:
+            self.states[job_id] = "PENDING"
+        return job_ids
+
+    def execute(self, command: str) -> str:
+        self.commands.append(command)
+        if command.startswith("scancel "):
+            self.states[command.removeprefix("scancel ")] = "CANCELLED by 0"
+            return ""
+
+        return "\n".join(
+            f"{job_id}|{state}" for job_id, state in self.states.items()
+        )
+
+    def advance(self) -> None:
+        """Start the pending jobs, complete the running ones."""
+        for job_id, state in self.states.items():
+            if state == "RUNNING":
+                self.states[job_id] = "COMPLETED"
+            elif state == "PENDING":
+                self.states[job_id] = "RUNNING"
+
+
+def test_poll_turns_sacct_states_into_events() -> None:
+    slurm: _Slurm = _Slurm()
+    event_source: SlurmEventSource[str] = SlurmEventSource(slurm)
+    job_ids: list[str] = event_source.submit_many("-t task", 4)
+    single_job_id: str = event_source.submit("-t task")
+
+    slurm.states[job_ids[0]] = "RUNNING"
+    slurm.states[job_ids[1]] = "COMPLETED"
+    slurm.states[job_ids[2]] = "FAILED"
+    slurm.states[single_job_id] = "CANCELLED by 1000"
+    # Pending tasks of an array are reported together.
+    del slurm.states[job_ids[3]]
+    slurm.states["1_[3]"] = "PENDING"
+    slurm.states["not a job"] = ""
+
+    assert event_source.poll() == [
+        (job_ids[0], WorkerEvent.START),
+        (job_ids[1], WorkerEvent.START),
+        (job_ids[1], WorkerEvent.END),
+        (job_ids[2], WorkerEvent.START),
+        (job_ids[2], WorkerEvent.FAIL),
+        (single_job_id, WorkerEvent.START),
+        (single_job_id, WorkerEvent.FAIL),
+    ]
+    assert slurm.commands == ["sacct -n -X -P -o JobID,State -j 1,2"]
+    assert event_source.active() == {job_ids[0], job_ids[3]}
+    assert event_source.poll() == []
+
+    event_source.cancel(job_ids[0])
+    assert event_source.poll() == [(job_ids[0], WorkerEvent.FAIL)]
+
+
+def test_batch_policy_keeps_the_batch_full() -> None:
+    slurm: _Slurm = _Slurm()
+    event_source: SlurmEventSource[str] = SlurmEventSource(slurm)
+    policy: BatchPolicy[str, str] = BatchPolicy(
+        args="-t task",
+        executions=IntGTZ(5),
+        size=IntGTZ(2),
+        submitter=event_source,
+    )
+    assert len(event_source.active()) == 2
+
+    while not policy.is_completed():
+        slurm.advance()
+        for event in event_source.poll():
+            policy.update(event)
+        assert len(event_source.active()) <= 2
+
+    assert list(slurm.states.values()).count("COMPLETED") >= 5
+    assert not event_source.active()
+
+
+def test_failed_workers_are_replaced() -> None:
+    slurm: _Slurm = _Slurm()
+    event_source: SlurmEventSource[str] = SlurmEventSource(slurm)
+    policy: BatchPolicy[str, str] = BatchPolicy(
+        args="-t task",
+        executions=IntGTZ(2),
+        size=IntGTZ(2),
+        submitter=event_source,
+    )
+    for job_id in event_source.active():
+        slurm.states[job_id] = "NODE_FAIL"
+    for event in event_source.poll():
+        policy.update(event)
+
+    assert len(event_source.active()) == 2
+    assert not policy.is_completed()
+
+
+def test_resubmitted_workers_take_the_place_of_cancelled_ones() -> None:
+    slurm: _Slurm = _Slurm()
+    event_source: SlurmEventSource[str] = SlurmEventSource(slurm)
+    policy: BatchPolicy[str, str] = BatchPolicy(
+        args="-t task",
+        executions=IntGTZ(2),
+        size=IntGTZ(2),
+        submitter=event_source,
+    )
+    slurm.advance()
+    for event in event_source.poll():
+        policy.update(event)
+
+    (straggler, _) = sorted(event_source.active())
+    event_source.cancel(straggler)
+    resubmitted: str = policy.resubmit("-t task -c trials/straggler.json")
+    for event in event_source.poll():
+        policy.update(event)
+    assert straggler not in event_source.active()
+    assert len(event_source.active()) == 2
+
+    # Its end does not count as an execution, the batch is kept full.
+    slurm.advance()
+    slurm.advance()
+    for event in event_source.poll():
+        policy.update(event)
+    assert slurm.states[resubmitted] == "COMPLETED"
+    assert len(event_source.active()) == 2
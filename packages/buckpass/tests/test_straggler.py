@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any
+
+from buckpass.core.policy import Policy
+from buckpass.policy.batch import WorkerEvent
+from buckpass.policy.straggler import StragglerPolicy
+
+if TYPE_CHECKING:
+    from conftest import Clock
+
+
+class _Policy(Policy[tuple[int, WorkerEvent]]):
+    def __init__(self) -> None:
+        super().__init__()
+        self.events: list[tuple[int, WorkerEvent]] = []
+        self.ticks: int = 0
+
+    def update(self, event: tuple[int, WorkerEvent]) -> None:
+        self.events.append(event)
+
+    def tick(self) -> None:
+        self.ticks += 1
+
+
+def _straggler_policy(
+    clock: Clock, **kwargs: Any
+) -> tuple[StragglerPolicy[int], list[int], list[int]]:
+    cancelled: list[int] = []
+    mitigated: list[int] = []
+    policy: StragglerPolicy[int] = StragglerPolicy(
+        _Policy(),
+        cancel=cancelled.append,
+        mitigate=mitigated.append,
+        clock=clock,
+        **kwargs,
+    )
+    return (policy, cancelled, mitigated)
+
+
+def _complete(
+    policy: StragglerPolicy[int], clock: Clock, durations: list[float]
+) -> None:
+    for worker_id, duration in enumerate(durations):
+        policy.update((worker_id, WorkerEvent.START))
+        clock.now += duration
+        policy.update((worker_id, WorkerEvent.END))
+
+
+def test_stragglers_are_cancelled_and_mitigated(clock: Clock) -> None:
+    (policy, cancelled, mitigated) = _straggler_policy(
+        clock, factor=2, warmup=3
+    )
+    _complete(policy, clock, [10, 12, 14])
+    assert policy.threshold() == 12 + 2 * 2
+
+    policy.update((100, WorkerEvent.START))
+    clock.now += 16
+    policy.tick()
+    assert not cancelled
+
+    clock.now += 1
+    policy.tick()
+    assert cancelled == mitigated == [100]
+    assert policy.stragglers == {100}
+
+    policy.tick()
+    assert cancelled == [100]
+
+
+def test_no_worker_is_cancelled_during_the_warmup(clock: Clock) -> None:
+    (policy, cancelled, _) = _straggler_policy(clock, warmup=3)
+    _complete(policy, clock, [10, 10])
+    policy.update((100, WorkerEvent.START))
+    clock.now += 1000
+    policy.tick()
+
+    assert policy.threshold() is None
+    assert not cancelled
+
+
+def test_durations_measured_by_polling_leave_a_margin(clock: Clock) -> None:
+    # With a poll interval of 30 seconds every duration is 30 seconds, the
+    # median absolute deviation is 0.
+    (policy, cancelled, _) = _straggler_policy(clock, margin=60)
+    _complete(policy, clock, [30] * 5)
+    policy.update((100, WorkerEvent.START))
+
+    clock.now += 30.001
+    policy.tick()
+    assert not cancelled
+
+    clock.now += 60
+    policy.tick()
+    assert cancelled == [100]
+
+
+def test_workers_are_not_cancelled_before_min_duration(clock: Clock) -> None:
+    (policy, cancelled, _) = _straggler_policy(clock, min_duration=100)
+    _complete(policy, clock, [10] * 5)
+    policy.update((100, WorkerEvent.START))
+    clock.now += 99
+    policy.tick()
+    assert not cancelled
+
+    clock.now += 2
+    policy.tick()
+    assert cancelled == [100]
+
+
+def test_events_are_forwarded(clock: Clock) -> None:
+    inner: _Policy = _Policy()
+    policy: StragglerPolicy[int] = StragglerPolicy(
+        inner, cancel=lambda _: None, clock=clock
+    )
+    policy.update((1, WorkerEvent.START))
+    policy.update((1, WorkerEvent.FAIL))
+    policy.tick()
+
+    assert inner.events == [(1, WorkerEvent.START), (1, WorkerEvent.FAIL)]
+    assert inner.ticks == 1
@@ -0,0 +1,173 @@
+import dataclasses
+import itertools
+import json
+import os
+import random
+from pathlib import Path
+from time import perf_counter
+from typing import Any
+
+import libsbml
+from biological_scenarios_generation.model import (
+    BiologicalModel,
+    VirtualPatient,
+    model_annotation,
+)
+
+from core.blackbox import Cost, SimulationOptions, blackbox, precompile
+from core.lib import init
+
+option, logger = init()
+
+# Stiff problems need CVODE's BDF method with Newton iterations (dense
+# Jacobian), non-stiff ones are faster with the Adams method and functional
+# iterations, which never build a Jacobian.
+STIFF: list[bool] = [True, False]
+RELATIVE_TOLERANCES: list[float] = [1e-6, 1e-5, 1e-4, 1e-3]
+ABSOLUTE_TOLERANCES: list[float] = [1e-12, 1e-9, 1e-6]
+MAXIMUM_NUM_STEPS: list[int] = [20000, 5000]
+
+
+def _objectives(cost: Cost) -> list[float]:
+    return cost.normalization + cost.transitory + cost.order + cost.modifiers
+
+
+def _benchmark(
+    biological_model: BiologicalModel,
+    virtual_patients: list[VirtualPatient],
+    options: SimulationOptions,
+) -> tuple[float, list[list[float] | None]]:
+    """Total runtime and objectives (None on failure) of each patient."""
+    objectives: list[list[float] | None] = []
+    start_time = perf_counter()
+    for virtual_patient in virtual_patients:
+        try:
+            objectives.append(
+                _objectives(
+                    blackbox(biological_model, virtual_patient, options)
+                )
+            )
+        except Exception:  # noqa: BLE001
+            objectives.append(None)
+
+    return (perf_counter() - start_time, objectives)
+
+
+def _difference(
+    reference: list[list[float] | None], objectives: list[list[float] | None]
+) -> float:
+    """Largest change of an objective with respect to the reference run."""
+    difference: float = 0.0
+    for reference_objectives, candidate_objectives in zip(
+        reference, objectives, strict=True
+    ):
+        if reference_objectives is None:
+            continue
+        if candidate_objectives is None:
+            return float("inf")
+        difference = max(
+            difference,
+            *(
+                abs(objective - reference_objective)
+                for objective, reference_objective in zip(
+                    candidate_objectives, reference_objectives, strict=True
+                )
+            ),
+        )
+
+    return difference
+
+
+def main() -> None:
+    filepath: str | None = os.getenv("SBML")
+    assert filepath
+
+    sbml_document: libsbml.SBMLDocument = libsbml.readSBML(filepath)
+    # Calibrate against RoadRunner's defaults, not against settings written
+    # by a previous calibration.
+    biological_model: BiologicalModel = dataclasses.replace(
+        BiologicalModel.load(sbml_document), integrator={}
+    )
+
+    random.seed(int(os.getenv("RANDOM_STATE", default="1")))
+    virtual_patients: list[VirtualPatient] = [
+        biological_model()
+        for _ in range(int(os.getenv("CALIBRATION_SAMPLES", default="10")))
+    ]
+    cost_tolerance: float = float(
+        os.getenv("CALIBRATION_COST_TOLERANCE", default="1e-3")
+    )
+    # Faster settings are only chosen when they beat the best runtime so far
+    # by this fraction, rather than by timing noise.
+    min_speedup: float = float(
+        os.getenv("CALIBRATION_MIN_SPEEDUP", default="0.1")
+    )
+    options: SimulationOptions = SimulationOptions.from_env()
+
+    # Otherwise the JIT compilation would be timed with the reference.
+    precompile(biological_model)
+    (reference_runtime, reference) = _benchmark(
+        biological_model, virtual_patients, options
+    )
+    logger.info("reference runtime %s", reference_runtime)
+
+    best_runtime: float = reference_runtime
+    best_integrator: dict[str, Any] = {}
+    for (
+        stiff,
+        relative_tolerance,
+        absolute_tolerance,
+        maximum_num_steps,
+    ) in itertools.product(
+        STIFF, RELATIVE_TOLERANCES, ABSOLUTE_TOLERANCES, MAXIMUM_NUM_STEPS
+    ):
+        integrator: dict[str, Any] = {
+            "stiff": stiff,
+            "relative_tolerance": relative_tolerance,
+            "absolute_tolerance": absolute_tolerance,
+            "maximum_num_steps": maximum_num_steps,
+        }
+        (runtime, objectives) = _benchmark(
+            biological_model,
+            virtual_patients,
+            dataclasses.replace(
+                options, integrator=options.integrator | integrator
+            ),
+        )
+        difference: float = _difference(reference, objectives)
+        logger.info(
+            json.dumps(
+                {
+                    "integrator": integrator,
+                    "runtime": runtime,
+                    "difference": difference,
+                }
+            )
+        )
+
+        if difference <= cost_tolerance and runtime < best_runtime * (
+            1 - min_speedup
+        ):
+            best_runtime = runtime
+            best_integrator = integrator
+
+    logger.info(
+        "chosen %s, runtime %s (reference %s)",
+        best_integrator,
+        best_runtime,
+        reference_runtime,
+    )
+
+    annotation: dict[str, Any] = model_annotation(sbml_document)
+    annotation["integrator"] = best_integrator
+    sbml_document.getModel().setAnnotation(json.dumps(annotation))
+
+    with Path(os.getenv("CALIBRATED_SBML", default=filepath)).open("w") as file:
+        _ = file.write(libsbml.writeSBMLToString(sbml_document))
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    except Exception:
+        logger.exception("")
@@ -1,13 +1,18 @@
+import dataclasses
+import hashlib
+import itertools
 import math
 import os
-import sys
+import weakref
 from collections.abc import Callable
+from concurrent.futures import Future, ProcessPoolExecutor
 from dataclasses import dataclass, field
-from typing import TypeAlias
+from pathlib import Path
+from time import perf_counter
+from typing import Any, TypeAlias
 
 import libsbml
 import numpy as np
-import pylab
 import roadrunner
 from biological_scenarios_generation.core import IntGTZ
 from biological_scenarios_generation.model import (
@@ -16,10 +21,6 @@ from biological_scenarios_generation.model import (
     VirtualPatient,
 )
 
-from core.lib import init
-
-_ = init()
-
 FAIL_COST: float = 1  # sys.float_info.max
 
 Trajectory: TypeAlias = np.ndarray[tuple[int, ...], np.dtype[np.float64]]
@@ -28,67 +29,349 @@ Trajectory: TypeAlias = np.ndarray[tuple[int, ...], np.dtype[np.float64]]
 class ViolatedKineticConstantsPartialOrderError(Exception): ...
 
 
+class SimulationDivergedError(Exception): ...
+
+
+# RoadRunner only offers CVODE with a dense linear solver: on large networks
+# the Jacobian factorization dominates, the Adams method and functional
+# iterations never build a Jacobian. They only suit non-stiff models: with
+# kinetic constants in [10**-20, 10**20] and the `mean_` rate rules, the
+# generated models usually are stiff, so this is opt-in.
+JACOBIAN_FREE_INTEGRATOR: dict[str, Any] = {
+    "stiff": False,
+    "maximum_num_steps": 100000,
+}
+
+
 @dataclass(init=True, repr=False, eq=False, order=False, frozen=True)
 class Cost:
     normalization: list[float] = field(default_factory=list)
     transitory: list[float] = field(default_factory=list)
     order: list[float] = field(default_factory=list)
     modifiers: list[float] = field(default_factory=list)
+    metadata: dict[str, Any] = field(default_factory=dict)
 
 
-def _blackbox(
-    biological_model: BiologicalModel, virtual_patient: VirtualPatient
-) -> tuple[Trajectory, roadrunner.RoadRunner, Cost]:
-    simulation_start: int = int(os.getenv("SIMULATION_START", default="0"))
-    simulation_end: int = int(os.getenv("SIMULATION_END", default="10000"))
-    simulation_points: int = int(
-        os.getenv("SIMULATION_POINTS", default="100000")
-    )
-    transitory: float = float(os.getenv("TRANSITORY", default="0.75"))
+@dataclass(init=True, repr=False, eq=False, order=False, frozen=True)
+class SimulationOptions:
+    start: int = 0
+    end: int = 10000
+    points: int = 100000
+    transitory: float = 0.75
+    # Record only the columns the cost is computed on, at this many evenly
+    # spaced time points instead of `points`, so that the size of the
+    # trajectory does not depend on `points`.
+    output_points: int | None = None
+    # The simulation is split in `chunks` consecutive runs, the checks below
+    # happen between two runs.
+    chunks: int = 1
+    # Stop as soon as a species has been outside [0, 1] for more than this
+    # fraction of the points, or the trajectory is no longer finite.
+    early_abort: float | None = None
+    # Once the norm of the rates of change of the species is below this
+    # value the rest of the trajectory is extrapolated instead of simulated.
+    steady_state: float | None = None
+    # Settings of the integrator that differ from the ones of the model, for
+    # example `relative_tolerance`.
+    integrator: dict[str, Any] = field(default_factory=dict)
+    # Stop the simulation after this many seconds, checked between two
+    # chunks, or when the integrator takes more than `max_steps` internal
+    # steps between two points: the cost of the trajectory is then penalized.
+    max_runtime: float | None = None
+    max_steps: int | None = None
+    # Models with more floating species than this are integrated with
+    # `JACOBIAN_FREE_INTEGRATOR`, unless they have calibrated settings.
+    large_model_threshold: int | None = None
+
+    @staticmethod
+    def from_env() -> "SimulationOptions":
+        early_abort: float | None = (
+            float(os.environ["EARLY_ABORT"])
+            if "EARLY_ABORT" in os.environ
+            else None
+        )
+        steady_state: float | None = (
+            float(os.environ["STEADY_STATE"])
+            if "STEADY_STATE" in os.environ
+            else None
+        )
+        max_runtime: float | None = (
+            float(os.environ["MAX_RUNTIME_PER_TRIAL"])
+            if "MAX_RUNTIME_PER_TRIAL" in os.environ
+            else None
+        )
+        large_model_threshold: str = os.getenv(
+            "LARGE_MODEL_THRESHOLD", default=""
+        )
+
+        return SimulationOptions(
+            start=int(os.getenv("SIMULATION_START", default="0")),
+            end=int(os.getenv("SIMULATION_END", default="10000")),
+            points=int(os.getenv("SIMULATION_POINTS", default="100000")),
+            transitory=float(os.getenv("TRANSITORY", default="0.75")),
+            output_points=int(os.environ["SIMULATION_OUTPUT_POINTS"])
+            if "SIMULATION_OUTPUT_POINTS" in os.environ
+            else None,
+            chunks=int(
+                os.getenv(
+                    "SIMULATION_CHUNKS",
+                    default="1"
+                    if early_abort is None
+                    and steady_state is None
+                    and max_runtime is None
+                    else "10",
+                )
+            ),
+            early_abort=early_abort,
+            steady_state=steady_state,
+            max_runtime=max_runtime,
+            max_steps=int(os.environ["MAX_STEPS"])
+            if "MAX_STEPS" in os.environ
+            else None,
+            large_model_threshold=int(large_model_threshold)
+            if large_model_threshold
+            else None,
+        )
 
-    rr: roadrunner.RoadRunner = roadrunner.RoadRunner(
-        libsbml.writeSBMLToString(biological_model.sbml_document)
-    )
 
-    for k, value in virtual_patient.items():
-        rr[k] = value
+@dataclass(init=True, repr=False, eq=False, order=False, frozen=True)
+class _Columns:
+    """Columns of a trajectory each component of the cost is computed on.
+
+    They are looked up once per model instead of once per virtual patient.
+    """
+
+    selections: list[str]
+    time: int
+    normalization: list[int]
+    transitory: list[int]
+    species_order: list[tuple[int, int]]
+    # Species each `mean_` column of `transitory` is the mean of, and the
+    # `time_` column the means are computed with, if recorded.
+    transitory_species: list[int]
+    elapsed_time: int | None
+
+    @staticmethod
+    def of(
+        biological_model: BiologicalModel, selections: list[str]
+    ) -> "_Columns":
+        return _Columns(
+            selections=selections,
+            time=selections.index("time"),
+            normalization=[
+                column_number
+                for column_number, column_name in enumerate(selections)
+                if f"mean_{column_name.removeprefix('[').removesuffix(']')}"
+                in biological_model.other_parameters
+            ],
+            transitory=[
+                column_number
+                for column_number, column_name in enumerate(selections)
+                if "mean_" in column_name
+            ],
+            species_order=[
+                (
+                    selections.index(f"[{species_1}]"),
+                    selections.index(f"[{species_2}]"),
+                )
+                for species_1, species_2 in biological_model.species_order
+            ],
+            transitory_species=[
+                selections.index(f"[{column_name.removeprefix('mean_')}]")
+                for column_name in selections
+                if "mean_" in column_name
+            ],
+            elapsed_time=selections.index("time_")
+            if "time_" in selections
+            else None,
+        )
+
+
+@dataclass(init=True, repr=False, eq=False, order=False, frozen=True)
+class _CompiledModel:
+    rr: roadrunner.RoadRunner
+    # Every column RoadRunner records by default.
+    all_columns: _Columns
+    # Only the columns the cost is computed on.
+    cost_columns: _Columns
+    # The integrator settings every simulation starts from.
+    integrator: dict[str, Any]
+    species: int
+    reactions: int
+
+    @staticmethod
+    def compile(biological_model: BiologicalModel) -> "_CompiledModel":
+        rr: roadrunner.RoadRunner = roadrunner.RoadRunner(
+            libsbml.writeSBMLToString(biological_model.sbml_document)
+        )
+        all_columns: _Columns = _Columns.of(
+            biological_model, list(rr.timeCourseSelections)
+        )
+
+        cost_column_numbers: set[int] = {
+            all_columns.time,
+            *all_columns.normalization,
+            *all_columns.transitory,
+            *(column for pair in all_columns.species_order for column in pair),
+        }
+
+        return _CompiledModel(
+            rr=rr,
+            integrator={
+                setting: rr.integrator.getValue(setting)
+                for setting in rr.integrator.getSettings()
+            },
+            species=rr.model.getNumFloatingSpecies(),
+            reactions=rr.model.getNumReactions(),
+            all_columns=all_columns,
+            cost_columns=_Columns.of(
+                biological_model,
+                [
+                    column_name
+                    for column_number, column_name in enumerate(
+                        all_columns.selections
+                    )
+                    if column_number in cost_column_numbers
+                ],
+            ),
+        )
+
+
+_sbml_hashes: weakref.WeakKeyDictionary[BiologicalModel, str] = (
+    weakref.WeakKeyDictionary()
+)
+_compiled_models: dict[str, _CompiledModel] = {}
+
+
+def sbml_hash(biological_model: BiologicalModel) -> str:
+    """SHA-256 of the SBML document of the model, computed once per model."""
+    if biological_model not in _sbml_hashes:
+        _sbml_hashes[biological_model] = hashlib.sha256(
+            libsbml.writeSBMLToString(biological_model.sbml_document).encode()
+        ).hexdigest()
+
+    return _sbml_hashes[biological_model]
+
+
+def _compile(biological_model: BiologicalModel) -> _CompiledModel:
+    """JIT-compile the model once per process and reuse it afterwards."""
+    key: str = sbml_hash(biological_model)
+    if key not in _compiled_models:
+        _compiled_models[key] = _CompiledModel.compile(biological_model)
+
+    return _compiled_models[key]
+
+
+def precompile(biological_model: BiologicalModel) -> None:
+    """Compile the model now, e.g. so that forked processes share it."""
+    _ = _compile(biological_model)
+
 
-    result: Trajectory = rr.simulate(
-        start=simulation_start, end=simulation_end, points=simulation_points
+def _running_mean(time: Trajectory, trajectory: Trajectory) -> Trajectory:
+    """Mean of each column from the first time point up to each time point.
+
+    Used on models generated without the `mean_` rate rules, the integral is
+    approximated with the trapezoidal rule.
+    """
+    integral: Trajectory = np.zeros_like(trajectory)
+    integral[1:] = np.cumsum(
+        np.diff(time)[:, np.newaxis] * (trajectory[1:] + trajectory[:-1]) / 2,
+        axis=0,
     )
+    elapsed_time: Trajectory = (time - time[0])[:, np.newaxis]
 
-    cost: Cost = Cost()
+    return np.divide(
+        integral,
+        elapsed_time,
+        out=np.array(trajectory, copy=True),
+        where=elapsed_time > 0,
+    )
 
-    for column_number, column_name in enumerate(rr.timeCourseSelections):
-        _column_name = column_name.removeprefix("[").removesuffix("]")
-        if f"mean_{_column_name}" in biological_model.other_parameters:
-            points_violating_normalization_constraint: int = 0
-            for species_concentration in result[:, column_number]:
-                if species_concentration < 0 or species_concentration > 1:
-                    points_violating_normalization_constraint += 1
 
-            cost.normalization.append(
-                float(points_violating_normalization_constraint)
-                / float(simulation_points)
-            )
+def _cost(
+    biological_model: BiologicalModel,
+    virtual_patient: VirtualPatient,
+    columns: _Columns,
+    trajectory: Trajectory,
+    options: SimulationOptions,
+    *,
+    aborted: bool = False,
+    timed_out: bool = False,
+) -> Cost:
+    if aborted or timed_out:
+        # A stopped simulation is reported as a failure: its partial
+        # trajectory says nothing about the cost of the whole one.
+        return Cost(
+            normalization=[FAIL_COST] * len(columns.normalization),
+            transitory=[FAIL_COST] * len(columns.normalization),
+            order=[FAIL_COST] * len(columns.species_order),
+            modifiers=[FAIL_COST]
+            * len(_modifiers_cost(biological_model, virtual_patient)),
+        )
+
+    time: Trajectory = trajectory[:, columns.time]
+    species: Trajectory = trajectory[:, columns.normalization]
+    violations: Trajectory = (species < 0) | (species > 1)
+
+    points: int = options.output_points or options.points
+    normalization: Trajectory = np.count_nonzero(violations, axis=0) / float(
+        points
+    )
 
-        if "mean_" in column_name:
-            x_1: int = int((simulation_points - 1) * transitory)
-            x_2: int = simulation_points - 1
-            y_1: float = result[x_1, column_number]
-            y_2: float = result[x_2, column_number]
+    means: Trajectory = (
+        trajectory[:, columns.transitory]
+        if biological_model.mean_rate_rules
+        else _running_mean(time, species)
+    )
+    x_1: int = int((options.points - 1) * options.transitory)
+    x_2: int = options.points - 1
+    y_1: Trajectory
+    y_2: Trajectory
+    if options.output_points:
+        # Means at the times the points x_1 and x_2 of the full trajectory
+        # would have been recorded at.
+        time_step: float = (options.end - options.start) / float(
+            options.points - 1
+        )
+        y_1 = np.array(
+            [
+                np.interp(options.start + x_1 * time_step, time, mean)
+                for mean in means.T
+            ]
+        )
+        y_2 = np.array(
+            [
+                np.interp(options.start + x_2 * time_step, time, mean)
+                for mean in means.T
+            ]
+        )
+    else:
+        y_1 = means[x_1]
+        y_2 = means[x_2]
+
+    s_1: Trajectory = trajectory[
+        -1, [column_1 for column_1, _ in columns.species_order]
+    ]
+    s_2: Trajectory = trajectory[
+        -1, [column_2 for _, column_2 in columns.species_order]
+    ]
+
+    return Cost(
+        normalization=normalization.tolist(),
+        transitory=np.arctan(np.abs((y_2 - y_1) / float(x_2 - x_1))).tolist(),
+        order=np.where(
+            (s_1 >= 0) & (s_1 <= 1) & (s_2 >= 0) & (s_2 <= 1),
+            np.maximum(s_1 - s_2, 0),
+            1,
+        ).tolist(),
+        modifiers=_modifiers_cost(biological_model, virtual_patient),
+    )
 
-            cost.transitory.append(
-                float(np.arctan(abs((y_2 - y_1) / float(x_2 - x_1))))
-            )
 
-    for species_1, species_2 in biological_model.species_order:
-        s_1 = result[-1, rr.timeCourseSelections.index(f"[{species_1}]")]
-        s_2 = result[-1, rr.timeCourseSelections.index(f"[{species_2}]")]
-        if 0 <= s_1 <= 1 and 0 <= s_2 <= 1:
-            cost.order.append(max(s_1 - s_2, 0))
-        else:
-            cost.order.append(1)
+def _modifiers_cost(
+    biological_model: BiologicalModel, virtual_patient: VirtualPatient
+) -> list[float]:
+    modifiers: list[float] = []
 
     # [10**-20, 10**20]
     for (
@@ -98,28 +381,208 @@ def _blackbox(
         k_1 = math.log10(virtual_patient[kinetic_constant_1])
         k_2 = math.log10(virtual_patient[kinetic_constant_2])
 
-        cost.modifiers.append(max(k_1 - k_2, 0) / 40)
+        modifiers.append(max(k_1 - k_2, 0) / 40)
+
+    return modifiers
+
+
+def _extrapolate(
+    steady_state: Trajectory,
+    columns: _Columns,
+    time: Trajectory,
+    options: SimulationOptions,
+) -> Trajectory:
+    """Trajectory of a model that reached a steady state, at the given times.
+
+    The species keep the value they have at the steady state, the `mean_`
+    rate rules are solved analytically.
+    """
+    trajectory: Trajectory = np.tile(steady_state, (len(time), 1))
+    trajectory[:, columns.time] = time
+    if columns.elapsed_time is not None:
+        trajectory[:, columns.elapsed_time] = time - options.start
+
+    # d(mean_x)/dt = (x - mean_x) / (time_ + 10e-6) with a constant x.
+    species: Trajectory = steady_state[columns.transitory_species]
+    trajectory[:, columns.transitory] = species + np.outer(
+        (steady_state[columns.time] - options.start + 10e-6)
+        / (time - options.start + 10e-6),
+        steady_state[columns.transitory] - species,
+    )
+
+    return trajectory
+
+
+def _simulate(
+    rr: roadrunner.RoadRunner, columns: _Columns, options: SimulationOptions
+) -> tuple[Trajectory, dict[str, Any]]:
+    """Simulate the model in `options.chunks` consecutive runs.
+
+    Returns the trajectory and what happened during the simulation: whether
+    it was stopped before `options.end`, or when a steady state was reached.
+    """
+    start_time: float = perf_counter()
+    points: int = options.output_points or options.points
+    time_step: float = (options.end - options.start) / float(points - 1)
+
+    segments: list[Trajectory] = []
+    points_violating_normalization_constraint: Trajectory = np.zeros(
+        len(columns.normalization)
+    )
+    for point_1, point_2 in itertools.pairwise(
+        np.unique(
+            np.linspace(0, points - 1, options.chunks + 1, dtype=int)
+        ).tolist()
+    ):
+        try:
+            segment: Trajectory = rr.simulate(
+                start=options.start + point_1 * time_step,
+                end=options.start + point_2 * time_step,
+                points=point_2 - point_1 + 1,
+            )
+        except RuntimeError as exception:
+            if "CV_TOO_MUCH_WORK" not in str(exception):
+                raise
+
+            return (_concatenate(segments, columns), {"timed_out": True})
+
+        # Every run starts from the last point of the previous one.
+        segments.append(segment[1:] if segments else segment)
+
+        if (
+            options.max_runtime is not None
+            and point_2 < points - 1
+            and perf_counter() - start_time > options.max_runtime
+        ):
+            return (_concatenate(segments, columns), {"timed_out": True})
+
+        if options.early_abort is not None:
+            if not np.isfinite(segment).all():
+                raise SimulationDivergedError
+
+            species: Trajectory = segments[-1][:, columns.normalization]
+            points_violating_normalization_constraint += np.count_nonzero(
+                (species < 0) | (species > 1), axis=0
+            )
+            if (
+                points_violating_normalization_constraint / float(points)
+                > options.early_abort
+            ).any():
+                return (np.concatenate(segments), {"early_abort": True})
+
+        if (
+            options.steady_state is not None
+            and point_2 < points - 1
+            and np.linalg.norm(rr.model.getFloatingSpeciesConcentrationRates())
+            < options.steady_state
+        ):
+            segments.append(
+                _extrapolate(
+                    segments[-1][-1],
+                    columns,
+                    options.start + np.arange(point_2 + 1, points) * time_step,
+                    options,
+                )
+            )
+            return (
+                np.concatenate(segments),
+                {"steady_state": options.start + point_2 * time_step},
+            )
+
+    return (_concatenate(segments, columns), {})
+
+
+def _concatenate(segments: list[Trajectory], columns: _Columns) -> Trajectory:
+    if not segments:
+        return np.empty((0, len(columns.selections)))
+
+    return segments[0] if len(segments) == 1 else np.concatenate(segments)
+
+
+def _blackbox(
+    biological_model: BiologicalModel,
+    virtual_patient: VirtualPatient,
+    options: SimulationOptions | None = None,
+) -> tuple[Trajectory, roadrunner.RoadRunner, Cost]:
+    options = options or SimulationOptions.from_env()
+
+    compiled_model: _CompiledModel = _compile(biological_model)
+    rr: roadrunner.RoadRunner = compiled_model.rr
+    columns: _Columns = (
+        compiled_model.cost_columns
+        if options.output_points
+        else compiled_model.all_columns
+    )
+
+    # Species, rate rules and the integrator state are left over from the
+    # previous virtual patient simulated with the same compiled model.
+    rr.resetAll()
+    rr.timeCourseSelections = columns.selections
+    large_model: bool = (
+        options.large_model_threshold is not None
+        and compiled_model.species > options.large_model_threshold
+        and not biological_model.integrator
+    )
+    for setting, value in (
+        compiled_model.integrator
+        | (JACOBIAN_FREE_INTEGRATOR if large_model else {})
+        | biological_model.integrator
+        | (
+            {"maximum_num_steps": options.max_steps}
+            if options.max_steps is not None
+            else {}
+        )
+        | options.integrator
+    ).items():
+        rr.integrator.setValue(setting, value)
+
+    for k, value in virtual_patient.items():
+        rr[k] = value
+
+    (result, metadata) = _simulate(rr, columns, options)
+
+    cost: Cost = _cost(
+        biological_model,
+        virtual_patient,
+        columns,
+        result,
+        options,
+        aborted=metadata.get("early_abort", False),
+        timed_out=metadata.get("timed_out", False),
+    )
+    cost.metadata.update(
+        metadata,
+        species=compiled_model.species,
+        reactions=compiled_model.reactions,
+        integrator_mode="jacobian_free" if large_model else "dense",
+    )
 
     return (result, rr, cost)
 
 
 def blackbox(
-    biological_model: BiologicalModel, virtual_patient: VirtualPatient
+    biological_model: BiologicalModel,
+    virtual_patient: VirtualPatient,
+    options: SimulationOptions | None = None,
 ) -> Cost:
     (_, _, cost) = _blackbox(
-        biological_model=biological_model, virtual_patient=virtual_patient
+        biological_model=biological_model,
+        virtual_patient=virtual_patient,
+        options=options,
     )
     return cost
 
 
 Config: TypeAlias = dict[SId, float]
+Result: TypeAlias = dict[str, Any]
 
 
 def objective_function_multi_objective(
     biological_model: BiologicalModel, num_objectives: IntGTZ
-) -> Callable[[Config], dict[str, list[float]]]:
-    def _objective_function(config: Config) -> dict[str, list[float]]:
+) -> Callable[[Config], Result]:
+    def _objective_function(config: Config) -> Result:
         objectives: list[float]
+        extra_info: dict[str, Any] = {}
         try:
             cost = blackbox(
                 biological_model,
@@ -134,19 +597,22 @@ def objective_function_multi_objective(
                 + cost.order
                 + cost.modifiers
             )
+            extra_info = cost.metadata
         except:
             objectives = [FAIL_COST] * num_objectives
+            extra_info = {"failed": True}
 
-        return {"objectives": objectives}
+        return {"objectives": objectives, "extra_info": extra_info}
 
     return _objective_function
 
 
 def objective_function_single_objective(
     biological_model: BiologicalModel, num_objectives: IntGTZ
-) -> Callable[[Config], dict[str, list[float]]]:
-    def _objective_function(config: Config) -> dict[str, list[float]]:
+) -> Callable[[Config], Result]:
+    def _objective_function(config: Config) -> Result:
         objectives: list[float]
+        extra_info: dict[str, Any] = {}
         try:
             cost = blackbox(
                 biological_model,
@@ -161,10 +627,190 @@ def objective_function_single_objective(
                 + [sum(cost.order)]
                 + [sum(cost.modifiers)]
             )
+            extra_info = cost.metadata
         except:
             objectives = [FAIL_COST] * num_objectives
+            extra_info = {"failed": True}
 
-        return {"objectives": [sum(objectives)]}
+        return {"objectives": [sum(objectives)], "extra_info": extra_info}
+
+    return _objective_function
+
+
+def objective_function_multi_fidelity(
+    biological_model: BiologicalModel, num_objectives: IntGTZ
+) -> Callable[[Config], Result]:
+    """Screen each config with a short, coarse simulation first.
+
+    Only the configs whose screening cost is within the SCREENING_QUANTILE
+    quantile of the screening costs seen so far are simulated in full, the
+    others report their screening cost.
+    """
+    options: SimulationOptions = SimulationOptions.from_env()
+    screening_options: SimulationOptions = dataclasses.replace(
+        options,
+        end=int(os.getenv("SCREENING_END", default="1000")),
+        points=int(os.getenv("SCREENING_POINTS", default="1000")),
+        output_points=None,
+        integrator=options.integrator
+        | {
+            "relative_tolerance": float(
+                os.getenv("SCREENING_RELATIVE_TOLERANCE", default="1e-3")
+            ),
+            "absolute_tolerance": float(
+                os.getenv("SCREENING_ABSOLUTE_TOLERANCE", default="1e-6")
+            ),
+        },
+    )
+    quantile: float = float(os.getenv("SCREENING_QUANTILE", default="0.25"))
+    warmup: int = int(os.getenv("SCREENING_WARMUP", default="10"))
+    # Screening costs can be shared by workers through a file, one per line.
+    history_path: Path | None = (
+        Path(os.environ["SCREENING_HISTORY"])
+        if "SCREENING_HISTORY" in os.environ
+        else None
+    )
+    history: list[float] = []
+
+    def _history() -> list[float]:
+        # A copy: the config being screened is recorded before it is ranked.
+        if history_path is None or not history_path.exists():
+            return list(history)
+
+        with history_path.open() as file:
+            return [float(line) for line in file if line.strip()]
+
+    def _record(screening_cost: float) -> None:
+        if history_path is None:
+            history.append(screening_cost)
+            return
+
+        with history_path.open("a") as file:
+            _ = file.write(f"{screening_cost}\n")
+
+    def _objectives(cost: Cost) -> list[float]:
+        return (
+            cost.normalization + cost.transitory + cost.order + cost.modifiers
+        )
+
+    def _objective_function(config: Config) -> Result:
+        virtual_patient: VirtualPatient = {
+            kinetic_constant: 10**value
+            for kinetic_constant, value in config.items()
+        }
+
+        objectives: list[float]
+        extra_info: dict[str, Any] = {}
+        try:
+            screening_cost = blackbox(
+                biological_model, virtual_patient, screening_options
+            )
+            objectives = _objectives(screening_cost)
+
+            screening_costs: list[float] = _history()
+            _record(sum(objectives))
+            if len(screening_costs) >= warmup and sum(objectives) > float(
+                np.quantile(screening_costs, quantile)
+            ):
+                return {
+                    "objectives": objectives,
+                    "extra_info": screening_cost.metadata
+                    | {"screened_out": True},
+                }
+
+            cost = blackbox(biological_model, virtual_patient, options)
+            objectives = _objectives(cost)
+            extra_info = cost.metadata | {"screened_out": False}
+        except Exception:  # noqa: BLE001
+            objectives = [FAIL_COST] * num_objectives
+            extra_info = {"failed": True}
+
+        return {"objectives": objectives, "extra_info": extra_info}
+
+    return _objective_function
+
+
+_worker_objective_function: Callable[[Config], Result] | None = None
+
+
+def _initialize_worker(sbml: str, num_objectives: IntGTZ) -> None:
+    global _worker_objective_function  # noqa: PLW0603
+
+    biological_model: BiologicalModel = BiologicalModel.load(
+        libsbml.readSBMLFromString(sbml)
+    )
+    _ = _compile(biological_model)
+    _worker_objective_function = objective_function_multi_objective(
+        biological_model, num_objectives
+    )
+
+
+def evaluate_in_pool(config: Config) -> Result:
+    """Evaluate `config` in a process of an `objective_function_pool`."""
+    assert _worker_objective_function
+    return _worker_objective_function(config)
+
+
+def objective_function_pool(
+    biological_model: BiologicalModel,
+    num_objectives: IntGTZ,
+    processes: IntGTZ | None = None,
+) -> ProcessPoolExecutor:
+    """Pool of processes to `submit(evaluate_in_pool, config)` to."""
+    return ProcessPoolExecutor(
+        max_workers=processes,
+        initializer=_initialize_worker,
+        initargs=(
+            libsbml.writeSBMLToString(biological_model.sbml_document),
+            num_objectives,
+        ),
+    )
+
+
+def objective_function_batch(
+    biological_model: BiologicalModel,
+    num_objectives: IntGTZ,
+    processes: IntGTZ | None = None,
+) -> Callable[[list[Config]], list[Result]]:
+    """Evaluate lists of configs on a pool of processes.
+
+    Each process of the pool compiles its own copy of the model when it
+    starts, results are returned in the same order as the configs.
+    """
+    executor: ProcessPoolExecutor | None = None
+
+    def _objective_function(configs: list[Config]) -> list[Result]:
+        nonlocal executor
+        if executor is None:
+            executor = objective_function_pool(
+                biological_model, num_objectives, processes
+            )
+
+        futures: list[Future[Result]] = [
+            executor.submit(evaluate_in_pool, config) for config in configs
+        ]
+
+        results: list[Result] = []
+        broken_pool: bool = False
+        for future in futures:
+            try:
+                results.append(future.result())
+            except Exception:  # noqa: BLE001
+                results.append(
+                    {
+                        "objectives": [FAIL_COST] * num_objectives,
+                        "extra_info": {"crashed": True},
+                    }
+                )
+                broken_pool = True
+
+        if broken_pool:
+            # A crashed process breaks the whole pool, which is then replaced
+            # on the next batch.
+            executor.shutdown(wait=False, cancel_futures=True)
+            executor = None
+
+        return results
 
     return _objective_function
 
@@ -172,14 +818,38 @@ def objective_function_single_objective(
 def plot(
     biological_model: BiologicalModel, virtual_patient: VirtualPatient
 ) -> Cost:
+    # Imported here, matplotlib alone takes longer to import than the rest of
+    # the worker.
+    import pylab  # noqa: PLC0415
+
     (trajectory, rr, cost) = _blackbox(
         biological_model=biological_model, virtual_patient=virtual_patient
     )
 
     time = trajectory[:, 0]
-    for col_number, col_name in enumerate(rr.timeCourseSelections):
-        if "mean" in col_name:
-            _ = pylab.plot(time, trajectory[:, col_number], label=str(col_name))
+    if biological_model.mean_rate_rules:
+        for col_number, col_name in enumerate(rr.timeCourseSelections):
+            if "mean" in col_name:
+                _ = pylab.plot(
+                    time, trajectory[:, col_number], label=str(col_name)
+                )
+                _ = pylab.legend()
+    else:
+        columns: _Columns = _Columns.of(
+            biological_model, list(rr.timeCourseSelections)
+        )
+        means: Trajectory = _running_mean(
+            time, trajectory[:, columns.normalization]
+        )
+        for col_number, col_name in enumerate(
+            columns.selections[column_number]
+            for column_number in columns.normalization
+        ):
+            _ = pylab.plot(
+                time,
+                means[:, col_number],
+                label=f"mean_{col_name.removeprefix('[').removesuffix(']')}",
+            )
             _ = pylab.legend()
 
     pylab.show()
@@ -3,12 +3,15 @@ import logging
 import sys
 from dataclasses import dataclass, field
 from logging import Logger
+from typing import TYPE_CHECKING
 
 import buckpass
 from biological_scenarios_generation.core import IntGEZ, IntGTZ
 from biological_scenarios_generation.model import BiologicalModel
 from dotenv import load_dotenv
-from openbox import space
+
+if TYPE_CHECKING:
+    from openbox import space
 
 FAIL_COST: float = 1  # sys.float_info.max
 
@@ -17,6 +20,7 @@ FAIL_COST: float = 1  # sys.float_info.max
 class Option:
     env: list[str]
     task_id: buckpass.core.OpenBoxTaskId = field(default="")
+    config: str = field(default="")
 
 
 def init() -> tuple[Option, Logger]:
@@ -25,6 +29,7 @@ def init() -> tuple[Option, Logger]:
         "-e", "--env", dest="env", nargs="*", metavar=None
     )
     _ = argument_parser.add_argument("-t", "--task", dest="task_id")
+    _ = argument_parser.add_argument("-c", "--config", dest="config")
     _ = argument_parser.add_argument(
         "-l",
         "--log",
@@ -38,6 +43,7 @@ def init() -> tuple[Option, Logger]:
 
     assert isinstance(args.env, list | None)
     assert isinstance(args.task_id, str | None)
+    assert isinstance(args.config, str | None)
 
     _ = load_dotenv()
     if args.env:
@@ -51,6 +57,7 @@ def init() -> tuple[Option, Logger]:
         Option(
             env=list(map(str.strip, args.env)) if args.env else [],
             task_id=buckpass.core.OpenBoxTaskId((args.task_id or "").strip()),
+            config=(args.config or "").strip(),
         ),
         logger,
     )
@@ -58,7 +65,10 @@ def init() -> tuple[Option, Logger]:
 
 def openbox_config_multiobjective(
     biological_model: BiologicalModel,
-) -> tuple[space.Space, IntGTZ, IntGEZ]:
+) -> tuple["space.Space", IntGTZ, IntGEZ]:
+    # OpenBox takes seconds to import, workers only need `num_objectives`.
+    from openbox import space  # noqa: PLC0415
+
     _space: space.Space = space.Space()
     _space.add_variables(
         [
@@ -72,14 +82,16 @@ def openbox_config_multiobjective(
         ]
     )
 
+    num_constraints = IntGEZ(0)
+
+    return _space, count_objectives(biological_model), num_constraints
+
+
+def count_objectives(biological_model: BiologicalModel) -> IntGTZ:
     # num_objectives = IntGTZ(4)
-    num_objectives = IntGTZ(
+    return IntGTZ(
         (len(biological_model.other_parameters) - 1)  # for normalization
         + (len(biological_model.other_parameters) - 1)  # for transitory
         + len(biological_model.species_order)
         + len(biological_model.kinetic_constants_order)
     )
-
-    num_constraints = IntGEZ(0)
-
-    return _space, num_objectives, num_constraints
@@ -0,0 +1,230 @@
+import dataclasses
+import hashlib
+import json
+import os
+import tempfile
+from collections import OrderedDict
+from collections.abc import Callable
+from functools import wraps
+from pathlib import Path
+from typing import Any
+
+from biological_scenarios_generation.core import IntGTZ
+from biological_scenarios_generation.model import BiologicalModel
+
+from core.blackbox import Config, Result, SimulationOptions, sbml_hash
+
+ObjectiveFunctionFactory = Callable[
+    [BiologicalModel, IntGTZ], Callable[[Config], Result]
+]
+BatchObjectiveFunctionFactory = Callable[
+    [BiologicalModel, IntGTZ], Callable[[list[Config]], list[Result]]
+]
+
+
+class Memo:
+    """Results of an objective function, keyed by quantized config.
+
+    The most recently used `size` results are kept in memory, all of them are
+    also stored in `path` (if any), one file per result, so that workers on
+    the same filesystem share them.
+    """
+
+    __namespace: str
+    __size: int
+    __path: Path | None
+    __decimals: int
+    __results: OrderedDict[str, Result]
+    __hits: int = 0
+    __misses: int = 0
+
+    def __init__(
+        self,
+        namespace: str,
+        size: int = 1024,
+        path: Path | None = None,
+        decimals: int = 6,
+    ) -> None:
+        self.__namespace = namespace
+        self.__size = size
+        self.__path = path
+        self.__decimals = decimals
+        self.__results = OrderedDict()
+
+        if self.__path is not None:
+            self.__path.mkdir(parents=True, exist_ok=True)
+
+    @property
+    def hits(self) -> int:
+        return self.__hits
+
+    @property
+    def misses(self) -> int:
+        return self.__misses
+
+    @staticmethod
+    def from_env(
+        biological_model: BiologicalModel, objective_function_name: str
+    ) -> "Memo":
+        # Results depend on the model (including its calibrated integrator
+        # settings), on the objective function and on the simulation options,
+        # screening ones included (where the screening history is kept does
+        # not matter).
+        namespace: str = hashlib.sha256(
+            json.dumps(
+                [
+                    sbml_hash(biological_model),
+                    objective_function_name,
+                    dataclasses.asdict(SimulationOptions.from_env()),
+                    {
+                        name: value
+                        for name, value in os.environ.items()
+                        if name.startswith("SCREENING_")
+                        and name != "SCREENING_HISTORY"
+                    },
+                ],
+                sort_keys=True,
+            ).encode()
+        ).hexdigest()
+
+        return Memo(
+            namespace=namespace,
+            size=int(os.getenv("MEMO_SIZE", default="1024")),
+            path=Path(os.environ["MEMO_PATH"])
+            if "MEMO_PATH" in os.environ
+            else None,
+            decimals=int(os.getenv("MEMO_DECIMALS", default="6")),
+        )
+
+    def key(self, config: Config) -> str:
+        return hashlib.sha256(
+            json.dumps(
+                [
+                    self.__namespace,
+                    sorted(
+                        (kinetic_constant, round(value, self.__decimals))
+                        for kinetic_constant, value in config.items()
+                    ),
+                ]
+            ).encode()
+        ).hexdigest()
+
+    def get(self, config: Config) -> Result | None:
+        key: str = self.key(config)
+        result: Result | None = self.__results.get(key)
+        if result is None and self.__path is not None:
+            try:
+                with (self.__path / f"{key}.json").open() as file:
+                    result = json.load(file)
+            except (OSError, json.JSONDecodeError):
+                result = None
+
+        if result is None:
+            self.__misses += 1
+            return None
+
+        self.__hits += 1
+        self.__remember(key, result)
+        return {
+            "objectives": list(result["objectives"]),
+            "extra_info": dict(result.get("extra_info", {}))
+            | {"memoized": True},
+        }
+
+    def put(self, config: Config, result: Result) -> None:
+        # Failures (e.g. of the solver or of IO), crashes and timeouts might
+        # not happen again, and whether a config is screened out depends on
+        # the configs screened before it.
+        extra_info: dict[str, Any] = result.get("extra_info", {})
+        if any(
+            extra_info.get(outcome, False)
+            for outcome in ("failed", "crashed", "timed_out", "screened_out")
+        ):
+            return
+
+        key: str = self.key(config)
+        self.__remember(key, result)
+        if self.__path is None:
+            return
+
+        # Written to a temporary file first, so that other workers never read
+        # a partial result.
+        with tempfile.NamedTemporaryFile(
+            "w", dir=self.__path, suffix=".tmp", delete=False
+        ) as file:
+            json.dump(result, file)
+        _ = Path(file.name).replace(self.__path / f"{key}.json")
+
+    def __remember(self, key: str, result: Result) -> None:
+        self.__results[key] = result
+        self.__results.move_to_end(key)
+        while len(self.__results) > self.__size:
+            _ = self.__results.popitem(last=False)
+
+
+def memoize(factory: ObjectiveFunctionFactory) -> ObjectiveFunctionFactory:
+    """Wrap an objective function factory to skip already seen configs."""
+
+    @wraps(factory)
+    def _factory(
+        biological_model: BiologicalModel, num_objectives: IntGTZ
+    ) -> Callable[[Config], Result]:
+        memo: Memo = Memo.from_env(biological_model, factory.__name__)
+        objective_function = factory(biological_model, num_objectives)
+
+        def _objective_function(config: Config) -> Result:
+            result: Result | None = memo.get(config)
+            if result is None:
+                result = objective_function(config)
+                memo.put(config, result)
+                result = {
+                    "objectives": result["objectives"],
+                    "extra_info": result.get("extra_info", {})
+                    | {"memoized": False},
+                }
+
+            result["extra_info"] |= {
+                "memo_hits": memo.hits,
+                "memo_misses": memo.misses,
+            }
+            return result
+
+        return _objective_function
+
+    return _factory
+
+
+def memoize_batch(
+    factory: BatchObjectiveFunctionFactory,
+) -> BatchObjectiveFunctionFactory:
+    """Like `memoize`, for `objective_function_batch`."""
+
+    @wraps(factory)
+    def _factory(
+        biological_model: BiologicalModel, num_objectives: IntGTZ
+    ) -> Callable[[list[Config]], list[Result]]:
+        memo: Memo = Memo.from_env(biological_model, factory.__name__)
+        objective_function = factory(biological_model, num_objectives)
+
+        def _objective_function(configs: list[Config]) -> list[Result]:
+            results: list[Result | None] = [
+                memo.get(config) for config in configs
+            ]
+            missing: list[int] = [
+                i for i, result in enumerate(results) if result is None
+            ]
+            for i, result in zip(
+                missing,
+                objective_function([configs[i] for i in missing])
+                if missing
+                else [],
+                strict=True,
+            ):
+                memo.put(configs[i], result)
+                results[i] = result
+
+            return [result for result in results if result is not None]
+
+        return _objective_function
+
+    return _factory
@@ -0,0 +1,159 @@
+import asyncio
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from time import perf_counter
+
+import buckpass
+import libsbml
+from biological_scenarios_generation.model import BiologicalModel
+from buckpass.core.openbox_api import (
+    FAILED,
+    SUCCESS,
+    TIMEOUT,
+    AsyncOpenBoxClient,
+    NoSuggestionError,
+)
+
+from core.blackbox import (
+    FAIL_COST,
+    Config,
+    Result,
+    evaluate_in_pool,
+    objective_function_pool,
+)
+from core.lib import init, openbox_config_multiobjective
+
+option, logger = init()
+
+
+async def _trials(
+    client: AsyncOpenBoxClient,
+    task_id: str,
+    pool: ProcessPoolExecutor,
+    num_objectives: int,
+) -> int:
+    """Evaluate suggestions until OpenBox has none left, return how many."""
+    loop = asyncio.get_running_loop()
+    evaluations: int = 0
+    while True:
+        start_time = perf_counter()
+        try:
+            config: Config = await client.get_suggestion(task_id)
+        except NoSuggestionError:
+            return evaluations
+        _timedelta_suggestion = perf_counter() - start_time
+
+        start_time = perf_counter()
+        result: Result
+        try:
+            result = await loop.run_in_executor(pool, evaluate_in_pool, config)
+        except Exception:  # noqa: BLE001
+            result = {
+                "objectives": [FAIL_COST] * num_objectives,
+                "extra_info": {"crashed": True},
+            }
+        _timedelta_blackbox = perf_counter() - start_time
+        logger.info(result["objectives"])
+
+        trial_state: int = SUCCESS
+        if result.get("extra_info", {}).get("timed_out", False):
+            trial_state = TIMEOUT
+        elif result["objectives"][0] == FAIL_COST:
+            trial_state = FAILED
+
+        await client.update_observation(
+            task_id,
+            config,
+            result["objectives"],
+            trial_info={
+                "cost": str(_timedelta_blackbox),
+                "worker_id": str(os.getpid()),
+                "trial_info": json.dumps(
+                    {
+                        "blackbox_duration": str(_timedelta_blackbox),
+                        "suggestion_duration": str(_timedelta_suggestion),
+                        **result.get("extra_info", {}),
+                    }
+                ),
+            },
+            trial_state=trial_state,
+        )
+        evaluations += 1
+
+
+async def _main() -> None:
+    filepath: str | None = os.getenv("SBML")
+    assert filepath
+
+    biological_model: BiologicalModel = BiologicalModel.load(
+        libsbml.readSBML(filepath)
+    )
+    _space, num_objectives, num_constraints = openbox_config_multiobjective(
+        biological_model
+    )
+    processes: int = int(
+        os.getenv("PROCESSES", default=str(os.cpu_count() or 1))
+    )
+    # More trials than processes, so that a process never waits for OpenBox.
+    trials: int = int(
+        os.getenv("CONCURRENT_TRIALS", default=str(2 * processes))
+    )
+
+    client: AsyncOpenBoxClient = AsyncOpenBoxClient(
+        buckpass.openbox_api.URL(
+            host=os.getenv("VM_HOST", default="localhost"), port=8000
+        ),
+        concurrency=trials,
+    )
+
+    task_id: str = option.task_id or await client.register_task(
+        config_space=_space,
+        server_ip=os.getenv("VM_HOST", default="localhost"),
+        port=8000,
+        email=str(os.getenv("OPENBOX_EMAIL")),
+        password=str(os.getenv("OPENBOX_PASSWORD")),
+        task_name=f"{filepath}_{'_'.join(option.env)}",
+        num_objectives=num_objectives,
+        num_constraints=num_constraints,
+        advisor_type=os.getenv("ADVISOR_TYPE", default="default"),
+        sample_strategy=os.getenv("SAMPLE_STRATEGY", default="bo"),
+        surrogate_type=os.getenv("SURROGATE_TYPE", default="prf"),
+        acq_type=os.getenv("ACQ_TYPE", default="mesmo"),
+        parallel_type=os.getenv("PARALLEL_STRATEGY", default="async"),
+        acq_optimizer_type=os.getenv(
+            "ACQ_OPTIMIZER_TYPE", default="random_scipy"
+        ),
+        initial_runs=0,
+        random_state=int(os.getenv("RANDOM_STATE", default="1")),
+        active_worker_num=trials,
+        max_runs=int(os.getenv("MAX_RUNS", default="1000")),
+        max_runtime_per_trial=int(
+            os.getenv("MAX_RUNTIME_PER_TRIAL", default="30")
+        ),
+        ref_point=[FAIL_COST] * num_objectives,
+    )
+    logger.info(task_id)
+
+    with objective_function_pool(
+        biological_model, num_objectives, buckpass.core.IntGTZ(processes)
+    ) as pool:
+        evaluations: list[int] = await asyncio.gather(
+            *(
+                _trials(client, task_id, pool, num_objectives)
+                for _ in range(trials)
+            )
+        )
+
+    logger.info("%d evaluations", sum(evaluations))
+
+
+def main() -> None:
+    asyncio.run(_main())
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    except Exception:
+        logger.exception("")
@@ -5,8 +5,9 @@ import random
 import libsbml
 from biological_scenarios_generation.model import BiologicalModel
 
-from .core.blackbox import Config, objective_function_multi_objective
+from .core.blackbox import Config, objective_function_batch
 from .core.lib import init, openbox_config_multiobjective
+from .core.memo import memoize_batch
 
 option, logger = init()
 
@@ -23,31 +24,43 @@ def main() -> None:
     best_config: None | dict[str, float] = None
     best_observations: None | list[float] = None
     best_value: None | float = None
-    _objective_function = objective_function_multi_objective(
+    _objective_function = memoize_batch(objective_function_batch)(
         biological_model, num_objectives
     )
-    for _ in range(1000):
-        config: Config = {
-            kinetic_constant: random.uniform(
-                category.interval().lower_bound, category.interval().upper_bound
-            )
-            for kinetic_constant, category in biological_model.kinetic_constants.items()
-        }
-
-        result = _objective_function(config)["objectives"]
-        if best_config and best_value:
-            if sum(result) < best_value:
+    batch_size: int = int(os.getenv("BATCH_SIZE", default="8"))
+    for offset in range(0, 1000, batch_size):
+        configs: list[Config] = [
+            {
+                kinetic_constant: random.uniform(
+                    category.interval().lower_bound,
+                    category.interval().upper_bound,
+                )
+                for kinetic_constant, category in biological_model.kinetic_constants.items()
+            }
+            for _ in range(min(batch_size, 1000 - offset))
+        ]
+
+        for config, _result in zip(
+            configs, _objective_function(configs), strict=True
+        ):
+            result = _result["objectives"]
+            if best_config and best_value:
+                if sum(result) < best_value:
+                    best_config = config
+                    best_observations = result
+                    best_value = sum(result)
+                print(sum(result), best_value)
+            else:
                 best_config = config
-                best_observations = result
                 best_value = sum(result)
-            print(sum(result), best_value)
-        else:
-            best_config = config
-            best_value = sum(result)
-
-        history.append(
-            {"config": config, "observations": result, "result": sum(result)}
-        )
+
+            history.append(
+                {
+                    "config": config,
+                    "observations": result,
+                    "result": sum(result),
+                }
+            )
 
     print(best_config)
     print(best_observations)
@@ -1,8 +1,18 @@
+import json
+import math
 import os
+import sys
+from collections.abc import Callable
+from pathlib import Path
 
 import buckpass
 from biological_scenarios_generation.model import BiologicalModel, libsbml
+from buckpass.broker import suggestion_rate
+from buckpass.core.openbox_api import TIMEOUT
+from buckpass.policy.adaptive import AdaptivePolicy
+from buckpass.policy.batch import BatchPolicy
 from buckpass.policy.burst import BurstPolicy
+from buckpass.policy.straggler import StragglerPolicy
 
 from core.lib import FAIL_COST, init, openbox_config_multiobjective
 
@@ -13,6 +23,14 @@ def main() -> None:
     filepath: str | None = os.getenv("SBML")
     assert filepath
 
+    # The configs of cancelled stragglers are only known from TRIALS_PATH.
+    straggler_action: str | None = os.getenv("STRAGGLER_ACTION")
+    if straggler_action in {"resubmit", "timeout"} and not os.getenv(
+        "TRIALS_PATH"
+    ):
+        msg = f"STRAGGLER_ACTION={straggler_action} needs TRIALS_PATH"
+        raise ValueError(msg)
+
     biological_model: BiologicalModel = BiologicalModel.load(
         sbml_document=libsbml.readSBML(filepath)
     )
@@ -50,13 +68,157 @@ def main() -> None:
     )
     print(task_id)
 
-    _ = BurstPolicy(
-        args=f"-t {task_id} -e {' '.join(map(str, option.env))}",
-        size=buckpass.core.IntGTZ(max_runs),
-        submitter=buckpass.Uniroma1Submitter(),
+    # Pilot workers evaluate suggestions until the task reaches `max_runs`,
+    # one per parallel evaluation is enough. A job with CORES_PER_JOB cores
+    # runs as many evaluations at once.
+    args: str = f"-t {task_id} -e {' '.join(map(str, option.env))}"
+    cores: int = int(os.getenv("CORES_PER_JOB", default="1"))
+    batch_size: int = math.ceil(
+        int(os.getenv("BATCH_SIZE", default="8")) / cores
+    )
+    executions: buckpass.core.IntGTZ = buckpass.core.IntGTZ(
+        batch_size
+        if os.getenv("WORKER_MODE") == "pilot"
+        else math.ceil(max_runs / cores)
+    )
+    # SUBMITTER=local runs the workers on this machine instead of SLURM.
+    submitter: buckpass.Uniroma1Submitter | buckpass.LocalSubmitter = (
+        buckpass.LocalSubmitter(
+            command=[
+                sys.executable,
+                str(Path(__file__).with_name("worker.py")),
+            ],
+            max_workers=batch_size,
+            env={"WORKER_PROCESSES": str(cores)},
+        )
+        if os.getenv("SUBMITTER") == "local"
+        else buckpass.Uniroma1Submitter(cores=cores)
+    )
+
+    if os.getenv("POLICY") not in {"batch", "adaptive"}:
+        _ = BurstPolicy(args=args, size=executions, submitter=submitter)
+        if isinstance(submitter, buckpass.LocalSubmitter):
+            submitter.wait()
+        return
+
+    # Only BATCH_SIZE evaluations, in BATCH_SIZE / CORES_PER_JOB jobs, are
+    # queued or running at any time (with the adaptive policy, at least
+    # MIN_BATCH_SIZE jobs and at most that many, and, if the workers go
+    # through a `buckpass.broker` on BROKER_PORT, no more than OpenBox can
+    # serve suggestions to). The state of the jobs is polled every
+    # POLL_INTERVAL seconds.
+    event_source: buckpass.SlurmEventSource[str] | buckpass.LocalSubmitter = (
+        submitter
+        if isinstance(submitter, buckpass.LocalSubmitter)
+        else buckpass.SlurmEventSource(submitter)
+    )
+    policy: BatchPolicy[str, str] | AdaptivePolicy[str, str] = (
+        AdaptivePolicy(
+            args=args,
+            executions=executions,
+            min_size=buckpass.core.IntGTZ(
+                int(os.getenv("MIN_BATCH_SIZE", default="1"))
+            ),
+            max_size=buckpass.core.IntGTZ(batch_size),
+            submitter=event_source,
+            suggestion_rate=_suggestion_rate(task_id, cores),
+        )
+        if os.getenv("POLICY") == "adaptive"
+        else BatchPolicy(
+            args=args,
+            executions=executions,
+            size=buckpass.core.IntGTZ(batch_size),
+            submitter=event_source,
+        )
+    )
+
+    # With STRAGGLER_ACTION=resubmit|timeout, a job running for much longer
+    # than the completed ones (see `StragglerPolicy`) is cancelled, and the
+    # configs it was evaluating, kept by the workers in TRIALS_PATH, are
+    # resubmitted once, one job each in place of the cancelled one (and
+    # reported as timed out if they straggle again), or reported as timed
+    # out at once. Meant for one-shot workers. Job durations are only known
+    # to within POLL_INTERVAL, so a job is never a straggler before
+    # STRAGGLER_MARGIN (2 poll intervals) past the median, nor before
+    # STRAGGLER_MIN_DURATION (MAX_RUNTIME_PER_TRIAL) seconds.
+    poll_interval: float = float(os.getenv("POLL_INTERVAL", default="30"))
+    # Resubmitted jobs, and the file of the config each evaluates: the
+    # worker deletes it once the config is observed.
+    resubmitted: dict[str, str] = {}
+
+    def _mitigate(job_id: str) -> None:
+        trials: str = (
+            f"{os.getenv('PROJECT_PATH')}/{os.getenv('TRIALS_PATH')}/{job_id}"
+        )
+        if job_id in resubmitted:
+            config_path: str = resubmitted.pop(job_id)
+            command: str = (
+                f"cat {config_path}; rm -f {config_path} {trials}.*.json"
+            )
+        elif straggler_action == "resubmit":
+            for path in event_source.execute(f"ls {trials}.*.json").split():
+                resubmitted[policy.resubmit(f"{args} -c {path}")] = path
+            return
+        else:
+            command = f"cat {trials}.*.json; rm -f {trials}.*.json"
+
+        for line in event_source.execute(command).splitlines():
+            logger.info("%s timed out", job_id)
+            buckpass.openbox_api.update_observation(
+                url=buckpass.openbox_api.URL(host="localhost", port=8000),
+                task_id=task_id,
+                config_dict=json.loads(line),
+                objectives=[FAIL_COST] * num_objectives,
+                trial_info={
+                    "worker_id": job_id,
+                    "trial_info": json.dumps({"straggler": True}),
+                },
+                trial_state=TIMEOUT,
+            )
+
+    event_source.run(
+        StragglerPolicy(
+            policy,
+            cancel=event_source.cancel,
+            mitigate=_mitigate,
+            factor=float(os.getenv("STRAGGLER_FACTOR", default="5")),
+            warmup=int(os.getenv("STRAGGLER_WARMUP", default="5")),
+            margin=float(
+                os.getenv("STRAGGLER_MARGIN", default=str(2 * poll_interval))
+            ),
+            min_duration=float(
+                os.getenv(
+                    "STRAGGLER_MIN_DURATION",
+                    default=os.getenv("MAX_RUNTIME_PER_TRIAL", default="30"),
+                )
+            ),
+        )
+        if straggler_action in {"resubmit", "timeout"}
+        else policy,
+        interval=poll_interval,
+        until=policy.is_completed,
     )
 
 
+def _suggestion_rate(
+    task_id: str, cores: int
+) -> Callable[[], float | None] | None:
+    """Return the jobs per second the broker on BROKER_PORT can keep busy."""
+    if not os.getenv("BROKER_PORT"):
+        return None
+
+    url: buckpass.openbox_api.URL = buckpass.openbox_api.URL(
+        host="localhost", port=int(os.environ["BROKER_PORT"])
+    )
+
+    def _rate() -> float | None:
+        # A job evaluates CORES_PER_JOB suggestions at once.
+        rate: float | None = suggestion_rate(url, task_id)
+        return None if rate is None else rate / cores
+
+    return _rate
+
+
 if __name__ == "__main__":
     try:
         main()
@@ -0,0 +1,63 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+from time import perf_counter
+
+from core.lib import init
+
+option, logger = init()
+
+
+def _import_times(module: str) -> tuple[float, dict[str, int]]:
+    """Time a cold import of `module`, and of each module it imports."""
+    start_time = perf_counter()
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=Path(__file__).parent,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    wall_time = perf_counter() - start_time
+
+    import_times: dict[str, int] = {}
+    for line in process.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+
+        (_, cumulative, name) = line.removeprefix("import time:").split("|")
+        import_times[name.strip()] = int(cumulative)
+
+    return (wall_time, import_times)
+
+
+def main() -> None:
+    module: str = os.getenv("STARTUP_MODULE", default="worker")
+    repeat: int = int(os.getenv("STARTUP_REPEAT", default="5"))
+    top: int = int(os.getenv("STARTUP_TOP", default="15"))
+
+    wall_times: list[float] = []
+    import_times: dict[str, int] = {}
+    for _ in range(repeat):
+        (wall_time, import_times) = _import_times(module)
+        wall_times.append(wall_time)
+
+    logger.info(
+        "import %s: best %.3fs, worst %.3fs over %d runs",
+        module,
+        min(wall_times),
+        max(wall_times),
+        repeat,
+    )
+    for name, cumulative in sorted(
+        import_times.items(), key=lambda item: item[1], reverse=True
+    )[:top]:
+        logger.info("%10.3fs %s", cumulative / 1e6, name)
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    except Exception:
+        logger.exception("")
@@ -0,0 +1,58 @@
+from pathlib import Path
+
+from core.memo import Memo
+
+
+def test_results_are_keyed_by_quantized_config() -> None:
+    memo: Memo = Memo(namespace="model", decimals=3)
+    memo.put({"k_1": 0.12341, "k_2": 1.0}, {"objectives": [0.5]})
+
+    assert memo.get({"k_2": 1.0, "k_1": 0.12344}) == {
+        "objectives": [0.5],
+        "extra_info": {"memoized": True},
+    }
+    assert memo.get({"k_1": 0.124, "k_2": 1.0}) is None
+    assert Memo(namespace="other", decimals=3).get({"k_1": 0.1234}) is None
+    assert (memo.hits, memo.misses) == (1, 1)
+
+
+def test_least_recently_used_results_are_evicted() -> None:
+    memo: Memo = Memo(namespace="model", size=2)
+    for value in (1.0, 2.0, 3.0):
+        memo.put({"k": value}, {"objectives": [value]})
+    _ = memo.get({"k": 2.0})
+    memo.put({"k": 4.0}, {"objectives": [4.0]})
+
+    assert memo.get({"k": 1.0}) is None
+    assert memo.get({"k": 3.0}) is None
+    assert memo.get({"k": 2.0}) is not None
+    assert memo.get({"k": 4.0}) is not None
+
+
+def test_results_are_shared_through_the_filesystem(tmp_path: Path) -> None:
+    Memo(namespace="model", path=tmp_path).put({"k": 1.0}, {"objectives": [1]})
+
+    assert Memo(namespace="model", path=tmp_path).get({"k": 1.0}) == {
+        "objectives": [1],
+        "extra_info": {"memoized": True},
+    }
+    assert not list(tmp_path.glob("*.tmp"))
+
+
+def test_outcomes_that_do_not_depend_on_the_config_are_not_stored() -> None:
+    memo: Memo = Memo(namespace="model")
+    outcomes: tuple[str, ...] = (
+        "failed",
+        "crashed",
+        "timed_out",
+        "screened_out",
+    )
+    for value, outcome in enumerate(outcomes):
+        memo.put(
+            {"k": float(value)},
+            {"objectives": [1], "extra_info": {outcome: True}},
+        )
+
+    assert all(
+        memo.get({"k": float(value)}) is None for value in range(len(outcomes))
+    )
@@ -1,59 +1,111 @@
 import json
+import multiprocessing
 import os
+import uuid
+from collections.abc import Callable
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import UTC, datetime
+from pathlib import Path
 from time import perf_counter
 
 import buckpass
 import libsbml
 from biological_scenarios_generation.model import BiologicalModel
-from openbox.utils.constants import FAILED, SUCCESS
+from buckpass.core.openbox_api import (
+    FAILED,
+    SUCCESS,
+    TIMEOUT,
+    NoSuggestionError,
+)
 
-from core.blackbox import FAIL_COST, Config, objective_function_multi_objective
-from core.lib import init, openbox_config_multiobjective
+from core.blackbox import (
+    FAIL_COST,
+    Config,
+    Result,
+    objective_function_multi_fidelity,
+    objective_function_multi_objective,
+    precompile,
+)
+from core.lib import count_objectives, init
+from core.memo import memoize
 
 option, logger = init()
 
+# OPENBOX_PORT can point the workers to a `buckpass.broker` instead.
 OPENBOX_URL: buckpass.openbox_api.URL = buckpass.openbox_api.URL(
-    host=os.getenv("VM_HOST", default=""), port=8000
+    host=os.getenv("VM_HOST", default=""),
+    port=int(os.getenv("OPENBOX_PORT", default="8000")),
 )
 
 
-def main() -> None:
-    filepath: str | None = os.getenv("SBML")
-    assert filepath
+def _get_suggestion() -> tuple[Config, float]:
+    start_time = perf_counter()
+    config: Config = buckpass.openbox_api.get_suggestion(  # pyright: ignore[reportAny]
+        url=OPENBOX_URL, task_id=option.task_id
+    )
+    _timedelta_suggestion = perf_counter() - start_time
+    logger.info(config)
 
-    worker_start_time = datetime.now(tz=UTC)
+    return (config, _timedelta_suggestion)
 
-    # Load model
 
-    start_time = perf_counter()
-    biological_model = BiologicalModel.load(
-        libsbml.readSBML(
-            f"{os.getenv('HOME')}/{os.getenv('PROJECT_PATH')}/{filepath}"
+def _job_id() -> str:
+    if "BUCKPASS_JOB_ID" in os.environ:
+        return os.environ["BUCKPASS_JOB_ID"]
+    if "SLURM_ARRAY_TASK_ID" in os.environ:
+        return (
+            f"{os.getenv('SLURM_ARRAY_JOB_ID')}_"
+            f"{os.getenv('SLURM_ARRAY_TASK_ID')}"
         )
-    )
-    _, num_objectives, _ = openbox_config_multiobjective(biological_model)
-    _timedelta_load = perf_counter() - start_time
+    return str(os.getenv("SLURM_JOB_ID"))
 
-    # Ask suggestion
 
-    start_time = perf_counter()
-    config: Config = buckpass.openbox_api.get_suggestion(  # pyright: ignore[reportAny]
-        url=OPENBOX_URL, task_id=option.task_id
+def _trial_path(trial_info: dict[str, str]) -> Path | None:
+    """File the config being evaluated is kept in, if TRIALS_PATH is set."""
+    trials_path: str | None = os.getenv("TRIALS_PATH")
+    if not trials_path:
+        return None
+
+    return (
+        Path(f"{os.getenv('HOME')}/{os.getenv('PROJECT_PATH')}/{trials_path}")
+        / f"{_job_id()}.{trial_info.get('process', '0')}.json"
     )
-    _timedelta_suggestion = perf_counter() - start_time
-    logger.info(config)
+
+
+def _evaluate(
+    objective_function: Callable[[Config], Result],
+    config: Config,
+    trial_info: dict[str, str],
+) -> None:
+    trial_path: Path | None = _trial_path(trial_info)
+    if trial_path is not None:
+        trial_path.parent.mkdir(parents=True, exist_ok=True)
+        _ = trial_path.write_text(f"{json.dumps(config)}\n")
 
     # Compute objective function value
 
     start_time = perf_counter()
-    result = objective_function_multi_objective(
-        biological_model, num_objectives
-    )(config)
+    result = objective_function(config)
     _timedelta_blackbox = perf_counter() - start_time
     logger.info(result["objectives"])
 
-    # Send observation to OpenBox
+    _ = _update_observation(config, result, _timedelta_blackbox, trial_info)
+
+    if trial_path is not None:
+        trial_path.unlink(missing_ok=True)
+
+
+def _update_observation(
+    config: Config,
+    result: Result,
+    _timedelta_blackbox: float,
+    trial_info: dict[str, str],
+) -> float:
+    trial_state: int = SUCCESS
+    if result.get("extra_info", {}).get("timed_out", False):
+        trial_state = TIMEOUT
+    elif result["objectives"][0] == FAIL_COST:
+        trial_state = FAILED
 
     start_time = perf_counter()
     buckpass.openbox_api.update_observation(
@@ -67,18 +119,219 @@ def main() -> None:
             "worker_id": os.getenv("SLURM_JOB_ID"),
             "trial_info": json.dumps(
                 {
-                    "start_time": str(worker_start_time),
-                    "load_duration": str(_timedelta_load),
+                    **trial_info,
                     "blackbox_duration": str(_timedelta_blackbox),
-                    "suggestion_duration": str(_timedelta_suggestion),
+                    **result.get("extra_info", {}),
                 }
             ),
         },
-        trial_state=FAILED if result["objectives"][0] == FAIL_COST else SUCCESS,
+        trial_state=trial_state,
+        idempotency_key=str(uuid.uuid4()),
     )
     _timedelta_observation = perf_counter() - start_time
     logger.info(_timedelta_observation)
 
+    return _timedelta_observation
+
+
+def _pipeline(
+    objective_function: Callable[[Config], Result],
+    trial_info: dict[str, str],
+    wall_time: float,
+) -> None:
+    """Pilot loop that talks to OpenBox while the blackbox runs.
+
+    A background thread asks for the next suggestion and sends the previous
+    observation while the current config is evaluated.
+
+    Besides how long each request took, trial_info records how long the
+    evaluation had to wait for it: the rest was hidden behind the blackbox.
+    The next suggestion is only asked for if there is time left to evaluate
+    it too, assuming no evaluation is longer than the longest so far:
+    OpenBox would keep it pending otherwise.
+    """
+    start_time = perf_counter()
+    longest_evaluation: float = 0.0
+    evaluations: int = 0
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        next_suggestion: Future[tuple[Config, float]] | None = executor.submit(
+            _get_suggestion
+        )
+        observation: Future[float] | None = None
+        observation_info: dict[str, str] = {}
+        while next_suggestion is not None:
+            evaluation_start_time = perf_counter()
+            try:
+                (config, _timedelta_suggestion) = next_suggestion.result()
+            except NoSuggestionError:
+                logger.info(
+                    "no suggestion left after %d evaluations", evaluations
+                )
+                break
+            _timedelta_suggestion_wait = perf_counter() - evaluation_start_time
+
+            next_suggestion = (
+                executor.submit(_get_suggestion)
+                if evaluation_start_time - start_time + 2 * longest_evaluation
+                < wall_time
+                else None
+            )
+
+            blackbox_start_time = perf_counter()
+            result = objective_function(config)
+            _timedelta_blackbox = perf_counter() - blackbox_start_time
+            logger.info(result["objectives"])
+
+            if observation is not None:
+                observation_wait_start_time = perf_counter()
+                _timedelta_observation = observation.result()
+                observation_info = {
+                    "previous_observation_duration": str(
+                        _timedelta_observation
+                    ),
+                    "previous_observation_wait": str(
+                        perf_counter() - observation_wait_start_time
+                    ),
+                }
+
+            observation = executor.submit(
+                _update_observation,
+                config,
+                result,
+                _timedelta_blackbox,
+                trial_info
+                | observation_info
+                | {
+                    "suggestion_duration": str(_timedelta_suggestion),
+                    "suggestion_wait": str(_timedelta_suggestion_wait),
+                    "pilot_evaluation": str(evaluations),
+                },
+            )
+
+            longest_evaluation = max(
+                longest_evaluation, perf_counter() - evaluation_start_time
+            )
+            evaluations += 1
+        else:
+            logger.info("wall time spent after %d evaluations", evaluations)
+
+        if observation is not None:
+            _ = observation.result()
+
+
+def main() -> None:
+    filepath: str | None = os.getenv("SBML")
+    assert filepath
+
+    worker_start_time = datetime.now(tz=UTC)
+
+    # Load model
+
+    start_time = perf_counter()
+    biological_model = BiologicalModel.load(
+        libsbml.readSBML(
+            f"{os.getenv('HOME')}/{os.getenv('PROJECT_PATH')}/{filepath}"
+        )
+    )
+    num_objectives = count_objectives(biological_model)
+    _timedelta_load = perf_counter() - start_time
+
+    objective_function = memoize(
+        objective_function_multi_fidelity
+        if os.getenv("OBJECTIVE_FUNCTION") == "multi_fidelity"
+        else objective_function_multi_objective
+    )(biological_model, num_objectives)
+    trial_info: dict[str, str] = {
+        "start_time": str(worker_start_time),
+        "load_duration": str(_timedelta_load),
+    }
+
+    # A config of a straggling job, resubmitted by the orchestrator.
+    if option.config:
+        config_path: Path = Path(f"{os.getenv('HOME')}/{option.config}")
+        _evaluate(
+            objective_function,
+            json.loads(config_path.read_text()),
+            trial_info | {"resubmitted": option.config},
+        )
+        config_path.unlink(missing_ok=True)
+        return
+
+    # A job with N cores runs N evaluation loops, in processes forked after
+    # the model is compiled, so that they share it.
+    processes: int = int(
+        os.getenv(
+            "WORKER_PROCESSES",
+            default=os.getenv("SLURM_CPUS_PER_TASK", default="1"),
+        )
+    )
+    if processes == 1:
+        _run(objective_function, trial_info)
+        return
+
+    precompile(biological_model)
+    context = multiprocessing.get_context("fork")
+    workers: list[multiprocessing.process.BaseProcess] = [
+        context.Process(
+            target=_run,
+            args=(objective_function, trial_info | {"process": str(process)}),
+        )
+        for process in range(processes)
+    ]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+
+def _run(
+    objective_function: Callable[[Config], Result], trial_info: dict[str, str]
+) -> None:
+    if os.getenv("WORKER_MODE") != "pilot":
+        (config, _timedelta_suggestion) = _get_suggestion()
+        _evaluate(
+            objective_function,
+            config,
+            trial_info | {"suggestion_duration": str(_timedelta_suggestion)},
+        )
+        return
+
+    # A pilot worker keeps the model loaded and compiled, and evaluates
+    # suggestions until OpenBox has none left (the task reached `max_runs`)
+    # or the next evaluation might not fit in PILOT_WALL_TIME seconds.
+    wall_time: float = float(os.getenv("PILOT_WALL_TIME", default="3600"))
+    if os.getenv("PILOT_PIPELINE"):
+        _pipeline(objective_function, trial_info, wall_time)
+        return
+
+    start_time = perf_counter()
+    longest_evaluation: float = 0.0
+    evaluations: int = 0
+    while perf_counter() - start_time + longest_evaluation < wall_time:
+        evaluation_start_time = perf_counter()
+        try:
+            (config, _timedelta_suggestion) = _get_suggestion()
+        except NoSuggestionError:
+            logger.info("no suggestion left after %d evaluations", evaluations)
+            return
+
+        _evaluate(
+            objective_function,
+            config,
+            trial_info
+            | {
+                "suggestion_duration": str(_timedelta_suggestion),
+                "pilot_evaluation": str(evaluations),
+            },
+        )
+
+        longest_evaluation = max(
+            longest_evaluation, perf_counter() - evaluation_start_time
+        )
+        evaluations += 1
+
+    logger.info("wall time spent after %d evaluations", evaluations)
+
 
 if __name__ == "__main__":
     try: